@@ -2,354 +2,499 @@
 Configuration for IoT Smart Home System
 """
 import os
+import sys
 import secrets
-from typing import Dict, Any
+import functools
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Dict, Any, Callable, FrozenSet, Iterable, List, Mapping, Optional, Tuple
 
-class Config:
-    """Main configuration class"""
+
+@functools.cache
+def _env_snapshot() -> Dict[str, str]:
+    """Snapshot os.environ once so every setting resolves from the same dict"""
+    return dict(os.environ)
+
+
+def _env(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Look up a raw setting from the environment snapshot"""
+    return _env_snapshot().get(key, default)
+
+
+def _as_int(key: str, default: int) -> int:
+    """Parse an integer setting"""
+    return int(_env(key, default))
+
+
+def _as_float(key: str, default: float) -> float:
+    """Parse a float setting"""
+    return float(_env(key, default))
+
+
+def _as_bool(key: str, default: str) -> bool:
+    """Parse a 'true'/'false' setting"""
+    return _env(key, default).lower() == 'true'
+
+
+def _intern_fields(devices: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Intern the location/type strings repeated across device entries"""
+    for device in devices.values():
+        device['location'] = sys.intern(device['location'])
+        device['type'] = sys.intern(device['type'])
+    return devices
+
+
+def _group_names(pairs: Iterable[Tuple[str, str]]) -> Mapping[str, Tuple[str, ...]]:
+    """Build a read-only key -> (names...) index from (key, name) pairs"""
+    index: Dict[str, List[str]] = {}
+    for key, name in pairs:
+        index.setdefault(key, []).append(name)
+    return MappingProxyType({key: tuple(names) for key, names in index.items()})
+
+
+# Possible object types for camera detection (ordered, built once)
+_OBJECT_TYPES = (
+    'chair', 'table', 'sofa', 'wall', 'door', 'person',
+    'pet', 'toy', 'shoe', 'book', 'plant', 'box', 'none'
+)
+
+# Known RFID tag values ('None' means no tag presented)
+_RFID_VALUES = ('None', 'Tag001', 'Tag002', 'Tag003', 'Tag004')
+
+# Realistic sensor value ranges (read-only, shared by every caller)
+_SENSOR_RANGES = MappingProxyType({
+    'temperature': {'min': 15.0, 'max': 40.0, 'unit': '°C'},
+    'humidity': {'min': 20.0, 'max': 80.0, 'unit': '%'},
+    'pressure': {'min': 980.0, 'max': 1040.0, 'unit': 'hPa'},
+    'light': {'min': 0.0, 'max': 1000.0, 'unit': 'lux'},
+    'motion': {'min': 0, 'max': 1, 'unit': 'boolean'},
+    'co2': {'min': 400.0, 'max': 2500.0, 'unit': 'ppm'},
+    'gas': {'min': 0.0, 'max': 2000.0, 'unit': 'ppm'},
+    'smoke': {'min': 0, 'max': 1, 'unit': 'boolean'},
+    'distance': {'min': 5.0, 'max': 400.0, 'unit': 'cm'},
+    'door_sensor': {'min': 0, 'max': 1, 'unit': 'boolean'},
+    'water_leak': {'min': 0, 'max': 1, 'unit': 'boolean'},
+    'signal_strength': {'min': -90.0, 'max': -20.0, 'unit': 'dBm'},
+    'rfid': {'values': _RFID_VALUES, 'unit': 'string'},
+    'sound': {'min': 20.0, 'max': 110.0, 'unit': 'dB'},
+    'vibration': {'min': 0.0, 'max': 1.0, 'unit': 'g'},
+    'energy': {'min': 0.0, 'max': 4000.0, 'unit': 'W'},
+    'uv': {'min': 0.0, 'max': 12.0, 'unit': 'uv_index'},
+    'rain': {'min': 0, 'max': 1, 'unit': 'boolean'},
+    'glass_break': {'min': 0, 'max': 1, 'unit': 'boolean'},
+    'pressure_mat': {'min': 0, 'max': 1, 'unit': 'boolean'},
+    'camera': {'unit': 'image_ref'}
+})
+
+
+# Decision Rules Configuration
+_DECISION_RULES = MappingProxyType({
+    'temperature': {
+        'high_threshold': 30.0,  # °C
+        'low_threshold': 18.0,
+        'critical_high': 40.0,
+        'critical_low': 10.0
+    },
+    'humidity': {
+        'high_threshold': 70.0,  # %
+        'low_threshold': 30.0
+    },
+    'light': {
+        'dark_threshold': 200.0,  # lux
+        'bright_threshold': 800.0
+    },
+    'co2': {
+        'warning_threshold': 1000.0,  # ppm
+        'critical_threshold': 2000.0
+    },
+    'motion': {
+        'timeout': 300  # seconds before auto-off
+    },
+    'distance': {
+        'obstacle_threshold': 50.0,  # cm
+        'critical_threshold': 20.0
+    },
+    'gas': {
+        'warning_threshold': 800.0,  # ppm
+        'critical_threshold': 1500.0
+    },
+    'smoke': {
+        'detected_action': 'alarm'
+    },
+    'water_leak': {
+        'detected_action': 'shutdown'
+    },
+    'sound': {
+        'warning_threshold': 75.0,  # dB
+        'critical_threshold': 95.0
+    },
+    'vibration': {
+        'warning_threshold': 0.3,  # g
+        'critical_threshold': 0.6
+    },
+    'energy': {
+        'high_threshold': 1500.0,  # W
+        'critical_threshold': 2500.0
+    },
+    'uv': {
+        'high_threshold': 8.0  # UV index
+    },
+    'rain': {
+        'detected_action': 'rain_protection'
+    },
+    'glass_break': {
+        'detected_action': 'alarm'
+    },
+    'pressure_mat': {
+        'detected_action': 'presence'
+    }
+})
+
+# Flat (sensor_type, rule) -> threshold map for single-lookup checks
+_THRESHOLDS = MappingProxyType({
+    (sensor_type, rule): value
+    for sensor_type, rules in _DECISION_RULES.items()
+    for rule, value in rules.items()
+    if isinstance(value, (int, float))
+})
+
+# Sensor Configuration
+_SENSORS = MappingProxyType(_intern_fields({
+    'roof_station': {
+        'type': 'json',
+        'location': 'roof',
+        'sensors': ['temperature', 'humidity', 'pressure'],
+        'update_interval': 2.0,
+        'gateway_enabled': False  # Disabled to allow manual overrides
+    },
+    'living_room': {
+        'type': 'json',
+        'location': 'living_room',
+        'sensors': ['motion', 'light', 'temperature'],
+        'update_interval': 1.0,
+        'gateway_enabled': False
+    },
+    'kitchen': {
+        'type': 'json',
+        'location': 'kitchen',
+        'sensors': ['gas', 'smoke', 'temperature'],
+        'update_interval': 1.0,
+        'gateway_enabled': False
+    },
+    'dust_cleaner': {
+        'type': 'xml',
+        'location': 'mobile',
+        'sensors': ['distance', 'object_detection', 'signal_strength'],
+        'update_interval': 0.5,
+        'gateway_enabled': False
+    },
+    'bedroom': {
+        'type': 'json',
+        'location': 'bedroom',
+        'sensors': ['temperature', 'light', 'door_sensor'],
+        'update_interval': 2.0,
+        'gateway_enabled': False
+    },
+    'basement': {
+        'type': 'json',
+        'location': 'basement',
+        'sensors': ['water_leak', 'humidity', 'temperature'],
+        'update_interval': 2.0,
+        'gateway_enabled': False
+    },
+    'entrance': {
+        'type': 'json',
+        'location': 'entrance',
+        'sensors': ['motion', 'door_sensor', 'rfid', 'pressure_mat'],
+        'update_interval': 0.5,
+        'gateway_enabled': False
+    },
+    'garage': {
+        'type': 'json',
+        'location': 'garage',
+        'sensors': ['vibration', 'glass_break', 'motion', 'door_sensor'],
+        'update_interval': 1.5,
+        'gateway_enabled': False
+    },
+    'garden': {
+        'type': 'json',
+        'location': 'garden',
+        'sensors': ['rain', 'uv', 'light'],
+        'update_interval': 2.5,
+        'gateway_enabled': False
+    },
+    'utility_meter': {
+        'type': 'json',
+        'location': 'utility',
+        'sensors': ['energy', 'sound'],
+        'update_interval': 3.0,
+        'gateway_enabled': False
+    },
+    'cctv_entrance': {
+        'type': 'json',
+        'location': 'entrance',
+        'sensors': ['camera'],
+        'update_interval': 5.0,
+        'gateway_enabled': False
+    }
+}))
+
+# Actuator Configuration
+_ACTUATORS = MappingProxyType(_intern_fields({
+    'hvac_system': {
+        'type': 'climate_control',
+        'location': 'whole_house',
+        'states': ['off', 'heating', 'cooling', 'fan_only']
+    },
+    'living_room_lights': {
+        'type': 'light',
+        'location': 'living_room',
+        'dimmable': True
+    },
+    'bedroom_lights': {
+        'type': 'light',
+        'location': 'bedroom',
+        'dimmable': True
+    },
+    'kitchen_exhaust': {
+        'type': 'fan',
+        'location': 'kitchen',
+        'states': ['off', 'low', 'medium', 'high']
+    },
+    'entrance_lights': {
+        'type': 'light',
+        'location': 'entrance',
+        'dimmable': False
+    },
+    'fire_alarm': {
+        'type': 'alarm',
+        'location': 'whole_house',
+        'priority': 'critical'
+    },
+    'gas_alarm': {
+        'type': 'alarm',
+        'location': 'kitchen',
+        'priority': 'critical'
+    },
+    'water_shutoff': {
+        'type': 'valve',
+        'location': 'basement',
+        'priority': 'high'
+    },
+    'dust_cleaner_motor': {
+        'type': 'motor',
+        'location': 'mobile',
+        'states': ['off', 'cleaning', 'paused', 'returning']
+    },
+    'dehumidifier': {
+        'type': 'appliance',
+        'location': 'basement',
+        'states': ['off', 'on']
+    },
+    'door_lock': {
+        'type': 'lock',
+        'location': 'entrance',
+        'states': ['locked', 'unlocked']
+    },
+    'smart_plug': {
+        'type': 'switch',
+        'location': 'utility',
+        'states': ['off', 'on']
+    },
+    'rain_shutter': {
+        'type': 'shutter',
+        'location': 'garden',
+        'states': ['open', 'closed']
+    },
+    'siren': {
+        'type': 'alarm',
+        'location': 'garage',
+        'priority': 'critical'
+    }
+}))
+
+# Reverse index for co-located actuator lookups
+_ACTUATORS_BY_LOCATION = _group_names(
+    (cfg['location'], name) for name, cfg in _ACTUATORS.items()
+)
+
+# Gateway Outlier Detection Configuration
+_OUTLIER_DETECTION = MappingProxyType({
+    'enabled': True,
+    'method': 'iqr',  # interquartile range
+    'window_size': 10,  # number of readings to consider
+    'multiplier': 1.5,  # IQR multiplier for outlier detection
+    'ranges': {
+        'temperature': {'min': -20, 'max': 60},
+        'humidity': {'min': 0, 'max': 100},
+        'pressure': {'min': 900, 'max': 1100},
+        'light': {'min': 0, 'max': 100000},
+        'co2': {'min': 300, 'max': 5000},
+        'distance': {'min': 0, 'max': 400},
+        'sound': {'min': 20, 'max': 120},
+        'vibration': {'min': 0, 'max': 2},
+        'energy': {'min': 0, 'max': 5000},
+        'uv': {'min': 0, 'max': 15}
+    }
+})
+
+# Flat (sensor_type, 'min'|'max') -> limit map for gateway range checks
+_OUTLIER_RANGES = MappingProxyType({
+    (sensor_type, bound): value
+    for sensor_type, limits in _OUTLIER_DETECTION['ranges'].items()
+    for bound, value in limits.items()
+})
+
+# Security headers
+_SECURITY_HEADERS = MappingProxyType({
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block',
+    'Strict-Transport-Security': 'max-age=31536000; includeSubDomains'
+})
+
+
+def _device_keys() -> Mapping[str, str]:
+    """Sensor device keys (unique per device)"""
+    return MappingProxyType({
+        'roof_station': _env('ROOF_STATION_KEY', 'roof-device-key-2024'),
+        'living_room': _env('LIVING_ROOM_KEY', 'living-room-key-2024'),
+        'kitchen': _env('KITCHEN_KEY', 'kitchen-device-key-2024'),
+        'dust_cleaner': _env('DUST_CLEANER_KEY', 'dust-cleaner-key-2024'),
+        'bedroom': _env('BEDROOM_KEY', 'bedroom-device-key-2024'),
+        'basement': _env('BASEMENT_KEY', 'basement-device-key-2024'),
+        'entrance': _env('ENTRANCE_KEY', 'entrance-device-key-2024'),
+        'garage': _env('GARAGE_KEY', 'garage-device-key-2024'),
+        'garden': _env('GARDEN_KEY', 'garden-device-key-2024'),
+        'utility_meter': _env('UTILITY_METER_KEY', 'utility-meter-key-2024')
+    })
+
+
+def _cors_origins() -> FrozenSet[str]:
+    """Allowed CORS origins, stripped of whitespace and empty entries"""
+    return frozenset(
+        origin.strip()
+        for origin in _env('CORS_ORIGINS', 'http://localhost:3000').split(',')
+        if origin.strip()
+    )
+
+
+def _from_env(parse: Callable[..., Any], key: str, default: Any = None, **kwargs) -> Any:
+    """Dataclass field whose default is resolved from the environment snapshot"""
+    return field(default_factory=functools.partial(parse, key, default), **kwargs)
+
+
+@dataclass(frozen=True, slots=True)
+class _Settings:
+    """Main configuration (immutable, built once at import)"""
     
     # Server Configuration
-    CONTROLLER_HOST = os.getenv('CONTROLLER_HOST', 'localhost')
-    CONTROLLER_PORT = int(os.getenv('CONTROLLER_PORT', 5000))
+    CONTROLLER_HOST: str = _from_env(_env, 'CONTROLLER_HOST', 'localhost')
+    CONTROLLER_PORT: int = _from_env(_as_int, 'CONTROLLER_PORT', 5000)
+    SOCKETIO_ASYNC_MODE: str = _from_env(_env, 'SOCKETIO_ASYNC_MODE', 'threading')  # 'gevent' under Gunicorn
     
     # MongoDB Configuration
-    MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-    MONGODB_DATABASE = os.getenv('MONGODB_DATABASE', 'IOT')
+    MONGODB_URI: str = _from_env(_env, 'MONGODB_URI', 'mongodb://localhost:27017/')
+    MONGODB_DATABASE: str = _from_env(_env, 'MONGODB_DATABASE', 'IOT')
+    MONGODB_MAX_POOL_SIZE: int = _from_env(_as_int, 'MONGODB_MAX_POOL_SIZE', 200)
+    MONGODB_MIN_POOL_SIZE: int = _from_env(_as_int, 'MONGODB_MIN_POOL_SIZE', 20)
+    MONGODB_COMPRESSORS: str = _from_env(_env, 'MONGODB_COMPRESSORS', 'zlib')  # e.g. 'zstd,zlib' with zstandard installed
+    MONGODB_SOCKET_TIMEOUT_MS: int = _from_env(_as_int, 'MONGODB_SOCKET_TIMEOUT_MS', 30000)
+    MONGODB_UNACKNOWLEDGED_WRITES: bool = _from_env(_as_bool, 'MONGODB_UNACKNOWLEDGED_WRITES', 'false')  # w=0
     
     # Sensor Service Configuration
-    SENSOR_SERVICE_HOST = os.getenv('SENSOR_SERVICE_HOST', 'localhost')
-    SENSOR_SERVICE_PORT = int(os.getenv('SENSOR_SERVICE_PORT', 5001))
+    SENSOR_SERVICE_HOST: str = _from_env(_env, 'SENSOR_SERVICE_HOST', 'localhost')
+    SENSOR_SERVICE_PORT: int = _from_env(_as_int, 'SENSOR_SERVICE_PORT', 5001)
     
     # Gateway Configuration
-    GATEWAY_PORT = int(os.getenv('GATEWAY_PORT', 5002))
+    GATEWAY_PORT: int = _from_env(_as_int, 'GATEWAY_PORT', 5002)
     
     # Simulation Configuration
-    SIMULATION_INTERVAL = float(os.getenv('SIMULATION_INTERVAL', 3.0))  # seconds
-    CONTINUOUS_MODE = os.getenv('CONTINUOUS_MODE', 'true').lower() == 'true'
-    FIXED_CYCLES = int(os.getenv('FIXED_CYCLES', 20))
-    DEMO_MODE = os.getenv('DEMO_MODE', 'false').lower() == 'true'  # force fixed cycles with verbose cycle logs
+    SIMULATION_INTERVAL: float = _from_env(_as_float, 'SIMULATION_INTERVAL', 3.0)  # seconds
+    CONTINUOUS_MODE: bool = _from_env(_as_bool, 'CONTINUOUS_MODE', 'true')
+    FIXED_CYCLES: int = _from_env(_as_int, 'FIXED_CYCLES', 20)
+    DEMO_MODE: bool = _from_env(_as_bool, 'DEMO_MODE', 'false')  # force fixed cycles with verbose cycle logs
     
-    # Decision Rules Configuration
-    DECISION_RULES = {
-        'temperature': {
-            'high_threshold': 30.0,  # °C
-            'low_threshold': 18.0,
-            'critical_high': 40.0,
-            'critical_low': 10.0
-        },
-        'humidity': {
-            'high_threshold': 70.0,  # %
-            'low_threshold': 30.0
-        },
-        'light': {
-            'dark_threshold': 200.0,  # lux
-            'bright_threshold': 800.0
-        },
-        'co2': {
-            'warning_threshold': 1000.0,  # ppm
-            'critical_threshold': 2000.0
-        },
-        'motion': {
-            'timeout': 300  # seconds before auto-off
-        },
-        'distance': {
-            'obstacle_threshold': 50.0,  # cm
-            'critical_threshold': 20.0
-        },
-        'gas': {
-            'warning_threshold': 800.0,  # ppm
-            'critical_threshold': 1500.0
-        },
-        'smoke': {
-            'detected_action': 'alarm'
-        },
-        'water_leak': {
-            'detected_action': 'shutdown'
-        },
-        'sound': {
-            'warning_threshold': 75.0,  # dB
-            'critical_threshold': 95.0
-        },
-        'vibration': {
-            'warning_threshold': 0.3,  # g
-            'critical_threshold': 0.6
-        },
-        'energy': {
-            'high_threshold': 1500.0,  # W
-            'critical_threshold': 2500.0
-        },
-        'uv': {
-            'high_threshold': 8.0  # UV index
-        },
-        'rain': {
-            'detected_action': 'rain_protection'
-        },
-        'glass_break': {
-            'detected_action': 'alarm'
-        },
-        'pressure_mat': {
-            'detected_action': 'presence'
-        }
-    }
-    
-    # Sensor Configuration
-    SENSORS = {
-        'roof_station': {
-            'type': 'json',
-            'location': 'roof',
-            'sensors': ['temperature', 'humidity', 'pressure'],
-            'update_interval': 2.0,
-            'gateway_enabled': False  # Disabled to allow manual overrides
-        },
-        'living_room': {
-            'type': 'json',
-            'location': 'living_room',
-            'sensors': ['motion', 'light', 'temperature'],
-            'update_interval': 1.0,
-            'gateway_enabled': False
-        },
-        'kitchen': {
-            'type': 'json',
-            'location': 'kitchen',
-            'sensors': ['gas', 'smoke', 'temperature'],
-            'update_interval': 1.0,
-            'gateway_enabled': False
-        },
-        'dust_cleaner': {
-            'type': 'xml',
-            'location': 'mobile',
-            'sensors': ['distance', 'object_detection', 'signal_strength'],
-            'update_interval': 0.5,
-            'gateway_enabled': False
-        },
-        'bedroom': {
-            'type': 'json',
-            'location': 'bedroom',
-            'sensors': ['temperature', 'light', 'door_sensor'],
-            'update_interval': 2.0,
-            'gateway_enabled': False
-        },
-        'basement': {
-            'type': 'json',
-            'location': 'basement',
-            'sensors': ['water_leak', 'humidity', 'temperature'],
-            'update_interval': 2.0,
-            'gateway_enabled': False
-        },
-        'entrance': {
-            'type': 'json',
-            'location': 'entrance',
-            'sensors': ['motion', 'door_sensor', 'rfid', 'pressure_mat'],
-            'update_interval': 0.5,
-            'gateway_enabled': False
-        },
-        'garage': {
-            'type': 'json',
-            'location': 'garage',
-            'sensors': ['vibration', 'glass_break', 'motion', 'door_sensor'],
-            'update_interval': 1.5,
-            'gateway_enabled': False
-        },
-        'garden': {
-            'type': 'json',
-            'location': 'garden',
-            'sensors': ['rain', 'uv', 'light'],
-            'update_interval': 2.5,
-            'gateway_enabled': False
-        },
-        'utility_meter': {
-            'type': 'json',
-            'location': 'utility',
-            'sensors': ['energy', 'sound'],
-            'update_interval': 3.0,
-            'gateway_enabled': False
-        },
-        'cctv_entrance': {
-            'type': 'json',
-            'location': 'entrance',
-            'sensors': ['camera'],
-            'update_interval': 5.0,
-            'gateway_enabled': False
-        }
-    }
+    # Ingestion Configuration
+    ASYNC_INGEST: bool = _from_env(_as_bool, 'ASYNC_INGEST', 'false')  # queue JSON/XML/gateway payloads for a worker
+    INGEST_QUEUE_SIZE: int = _from_env(_as_int, 'INGEST_QUEUE_SIZE', 10000)
+    INIT_ACTUATOR_STATUS: bool = _from_env(_as_bool, 'INIT_ACTUATOR_STATUS', 'true')  # reset stored statuses at startup
+    DUPLICATE_WINDOW_SECONDS: float = _from_env(_as_float, 'DUPLICATE_WINDOW_SECONDS', 5.0)  # 0 disables retransmit dedup
     
-    # Actuator Configuration
-    ACTUATORS = {
-        'hvac_system': {
-            'type': 'climate_control',
-            'location': 'whole_house',
-            'states': ['off', 'heating', 'cooling', 'fan_only']
-        },
-        'living_room_lights': {
-            'type': 'light',
-            'location': 'living_room',
-            'dimmable': True
-        },
-        'bedroom_lights': {
-            'type': 'light',
-            'location': 'bedroom',
-            'dimmable': True
-        },
-        'kitchen_exhaust': {
-            'type': 'fan',
-            'location': 'kitchen',
-            'states': ['off', 'low', 'medium', 'high']
-        },
-        'entrance_lights': {
-            'type': 'light',
-            'location': 'entrance',
-            'dimmable': False
-        },
-        'fire_alarm': {
-            'type': 'alarm',
-            'location': 'whole_house',
-            'priority': 'critical'
-        },
-        'gas_alarm': {
-            'type': 'alarm',
-            'location': 'kitchen',
-            'priority': 'critical'
-        },
-        'water_shutoff': {
-            'type': 'valve',
-            'location': 'basement',
-            'priority': 'high'
-        },
-        'dust_cleaner_motor': {
-            'type': 'motor',
-            'location': 'mobile',
-            'states': ['off', 'cleaning', 'paused', 'returning']
-        },
-        'dehumidifier': {
-            'type': 'appliance',
-            'location': 'basement',
-            'states': ['off', 'on']
-        },
-        'door_lock': {
-            'type': 'lock',
-            'location': 'entrance',
-            'states': ['locked', 'unlocked']
-        },
-        'smart_plug': {
-            'type': 'switch',
-            'location': 'utility',
-            'states': ['off', 'on']
-        },
-        'rain_shutter': {
-            'type': 'shutter',
-            'location': 'garden',
-            'states': ['open', 'closed']
-        },
-        'siren': {
-            'type': 'alarm',
-            'location': 'garage',
-            'priority': 'critical'
-        }
-    }
+    # Decision Engine Configuration
+    HISTORY_MAXLEN: int = _from_env(_as_int, 'HISTORY_MAXLEN', 100)  # readings kept per (device, sensor type)
+    HISTORY_IDLE_SECONDS: int = _from_env(_as_int, 'HISTORY_IDLE_SECONDS', 3600)  # drop silent sensors' history
     
-    # Gateway Outlier Detection Configuration
-    OUTLIER_DETECTION = {
-        'enabled': True,
-        'method': 'iqr',  # interquartile range
-        'window_size': 10,  # number of readings to consider
-        'multiplier': 1.5,  # IQR multiplier for outlier detection
-        'ranges': {
-            'temperature': {'min': -20, 'max': 60},
-            'humidity': {'min': 0, 'max': 100},
-            'pressure': {'min': 900, 'max': 1100},
-            'light': {'min': 0, 'max': 100000},
-            'co2': {'min': 300, 'max': 5000},
-            'distance': {'min': 0, 'max': 400},
-            'sound': {'min': 20, 'max': 120},
-            'vibration': {'min': 0, 'max': 2},
-            'energy': {'min': 0, 'max': 5000},
-            'uv': {'min': 0, 'max': 15}
-        }
-    }
+    # Decision rules, device tables and their derived indexes
+    DECISION_RULES: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: _DECISION_RULES)
+    THRESHOLDS: Mapping[Tuple[str, str], float] = field(default_factory=lambda: _THRESHOLDS)
+    SENSORS: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: _SENSORS)
+    ACTUATORS: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: _ACTUATORS)
+    ACTUATORS_BY_LOCATION: Mapping[str, Tuple[str, ...]] = field(default_factory=lambda: _ACTUATORS_BY_LOCATION)
+    OUTLIER_DETECTION: Mapping[str, Any] = field(default_factory=lambda: _OUTLIER_DETECTION)
+    OUTLIER_RANGES: Mapping[Tuple[str, str], float] = field(default_factory=lambda: _OUTLIER_RANGES)
     
     # CORS Configuration
-    CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
+    CORS_ORIGINS: FrozenSet[str] = field(default_factory=_cors_origins)
     
     # Security Configuration
     # API Key for sensor authentication
-    API_KEY = os.getenv('IOT_API_KEY', 'iot-secure-api-key-2024')
+    API_KEY: str = _from_env(_env, 'IOT_API_KEY', 'iot-secure-api-key-2024', repr=False)
     
     # JWT Configuration
-    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', secrets.token_urlsafe(32))
-    JWT_ALGORITHM = 'HS256'
-    JWT_EXPIRATION_HOURS = int(os.getenv('JWT_EXPIRATION_HOURS', 24))
+    JWT_SECRET_KEY: str = field(
+        default_factory=lambda: _env('JWT_SECRET_KEY') or secrets.token_urlsafe(32),  # random only when unset
+        repr=False
+    )
+    JWT_ALGORITHM: str = 'HS256'
+    JWT_EXPIRATION_HOURS: int = _from_env(_as_int, 'JWT_EXPIRATION_HOURS', 24)
     
     # Gateway Security
-    GATEWAY_API_KEY = os.getenv('GATEWAY_API_KEY', 'gateway-secure-key-2024')
+    GATEWAY_API_KEY: str = _from_env(_env, 'GATEWAY_API_KEY', 'gateway-secure-key-2024', repr=False)
     
     # Sensor Device Keys (unique per device)
-    DEVICE_KEYS = {
-        'roof_station': os.getenv('ROOF_STATION_KEY', 'roof-device-key-2024'),
-        'living_room': os.getenv('LIVING_ROOM_KEY', 'living-room-key-2024'),
-        'kitchen': os.getenv('KITCHEN_KEY', 'kitchen-device-key-2024'),
-        'dust_cleaner': os.getenv('DUST_CLEANER_KEY', 'dust-cleaner-key-2024'),
-        'bedroom': os.getenv('BEDROOM_KEY', 'bedroom-device-key-2024'),
-        'basement': os.getenv('BASEMENT_KEY', 'basement-device-key-2024'),
-        'entrance': os.getenv('ENTRANCE_KEY', 'entrance-device-key-2024'),
-        'garage': os.getenv('GARAGE_KEY', 'garage-device-key-2024'),
-        'garden': os.getenv('GARDEN_KEY', 'garden-device-key-2024'),
-        'utility_meter': os.getenv('UTILITY_METER_KEY', 'utility-meter-key-2024')
-    }
+    DEVICE_KEYS: Mapping[str, str] = field(default_factory=_device_keys, repr=False)
     
     # SSL/TLS Configuration
-    SSL_ENABLED = os.getenv('SSL_ENABLED', 'false').lower() == 'true'
-    SSL_CERT_PATH = os.getenv('SSL_CERT_PATH', './certs/server.crt')
-    SSL_KEY_PATH = os.getenv('SSL_KEY_PATH', './certs/server.key')
+    SSL_ENABLED: bool = _from_env(_as_bool, 'SSL_ENABLED', 'false')
+    SSL_CERT_PATH: str = _from_env(_env, 'SSL_CERT_PATH', './certs/server.crt')
+    SSL_KEY_PATH: str = _from_env(_env, 'SSL_KEY_PATH', './certs/server.key')
     
     # Request signing for data integrity
-    ENABLE_REQUEST_SIGNING = os.getenv('ENABLE_REQUEST_SIGNING', 'true').lower() == 'true'
+    ENABLE_REQUEST_SIGNING: bool = _from_env(_as_bool, 'ENABLE_REQUEST_SIGNING', 'true')
     
     # Rate limiting (requests per minute per device)
-    RATE_LIMIT_PER_MINUTE = int(os.getenv('RATE_LIMIT_PER_MINUTE', 60))
+    RATE_LIMIT_PER_MINUTE: int = _from_env(_as_int, 'RATE_LIMIT_PER_MINUTE', 60)
     
     # Security headers
-    SECURITY_HEADERS = {
-        'X-Content-Type-Options': 'nosniff',
-        'X-Frame-Options': 'DENY',
-        'X-XSS-Protection': '1; mode=block',
-        'Strict-Transport-Security': 'max-age=31536000; includeSubDomains'
-    }
+    SECURITY_HEADERS: Mapping[str, str] = field(default_factory=lambda: _SECURITY_HEADERS)
     
     # Logging Configuration
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    LOG_LEVEL: str = _from_env(_env, 'LOG_LEVEL', 'INFO')
+    LOG_FORMAT: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    
+    def reset_env_cache(self):
+        """Re-read os.environ and refresh this instance in place (used by tests)"""
+        _env_snapshot.cache_clear()
+        fresh = _Settings()
+        for settings_field in fields(self):
+            # Keep a generated JWT secret: replacing it would invalidate every issued token
+            if settings_field.name == 'JWT_SECRET_KEY' and not _env('JWT_SECRET_KEY'):
+                continue
+            # Every module shares this instance through `from backend.config import Config`
+            object.__setattr__(self, settings_field.name, getattr(fresh, settings_field.name))
     
-    @classmethod
-    def get_sensor_ranges(cls) -> Dict[str, Dict[str, Any]]:
+    def get_sensor_ranges(self) -> Mapping[str, Dict[str, Any]]:
         """Get realistic sensor value ranges"""
-        return {
-            'temperature': {'min': 15.0, 'max': 40.0, 'unit': '°C'},
-            'humidity': {'min': 20.0, 'max': 80.0, 'unit': '%'},
-            'pressure': {'min': 980.0, 'max': 1040.0, 'unit': 'hPa'},
-            'light': {'min': 0.0, 'max': 1000.0, 'unit': 'lux'},
-            'motion': {'min': 0, 'max': 1, 'unit': 'boolean'},
-            'co2': {'min': 400.0, 'max': 2500.0, 'unit': 'ppm'},
-            'gas': {'min': 0.0, 'max': 2000.0, 'unit': 'ppm'},
-            'smoke': {'min': 0, 'max': 1, 'unit': 'boolean'},
-            'distance': {'min': 5.0, 'max': 400.0, 'unit': 'cm'},
-            'door_sensor': {'min': 0, 'max': 1, 'unit': 'boolean'},
-            'water_leak': {'min': 0, 'max': 1, 'unit': 'boolean'},
-            'signal_strength': {'min': -90.0, 'max': -20.0, 'unit': 'dBm'},
-            'rfid': {'values': ['None', 'Tag001', 'Tag002', 'Tag003', 'Tag004'], 'unit': 'string'},
-            'sound': {'min': 20.0, 'max': 110.0, 'unit': 'dB'},
-            'vibration': {'min': 0.0, 'max': 1.0, 'unit': 'g'},
-            'energy': {'min': 0.0, 'max': 4000.0, 'unit': 'W'},
-            'uv': {'min': 0.0, 'max': 12.0, 'unit': 'uv_index'},
-            'rain': {'min': 0, 'max': 1, 'unit': 'boolean'},
-            'glass_break': {'min': 0, 'max': 1, 'unit': 'boolean'},
-            'pressure_mat': {'min': 0, 'max': 1, 'unit': 'boolean'},
-            'camera': {'unit': 'image_ref'}
-        }
+        return _SENSOR_RANGES
     
-    @classmethod
-    def get_object_types(cls) -> list:
+    def get_object_types(self) -> Tuple[str, ...]:
         """Get possible object types for camera detection"""
-        return [
-            'chair', 'table', 'sofa', 'wall', 'door', 'person', 
-            'pet', 'toy', 'shoe', 'book', 'plant', 'box', 'none'
-        ]
+        return _OBJECT_TYPES
+
+
+config = _Settings()
+
+# Back-compat alias: callers keep using Config.<SETTING>
+Config = config
+
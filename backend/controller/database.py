@@ -1,66 +1,285 @@
 """
 MongoDB database manager for IoT system
 """
-from pymongo import MongoClient, DESCENDING
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import MongoClient, DESCENDING, UpdateOne
 from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
 from pymongo.database import Database
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple
 from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Documents fetched per round trip when streaming cursors
+CURSOR_BATCH_SIZE = 200
+
+# Append-only collections created as time-series (name -> metaField); timeField is 'timestamp'
+TIMESERIES_COLLECTIONS = {
+    'sensor_readings': 'device_id',
+    'actuator_commands': 'actuator_id',
+    'gateway_logs': 'device_id'
+}
+
+# Default find() projections: only the fields API callers actually read.
+# Sensor readings keep every stored field (single readings and whole device
+# groups, readings array included) and drop only the ObjectId _id
+SENSOR_READING_PROJECTION = {
+    '_id': 0, 'sensor_id': 1, 'sensor_type': 1, 'value': 1, 'unit': 1, 'timestamp': 1,
+    'device_id': 1, 'location': 1, 'format': 1, 'gateway_processed': 1, 'readings': 1
+}
+ACTUATOR_HISTORY_PROJECTION = {
+    '_id': 0, 'actuator_id': 1, 'state': 1, 'value': 1, 'reason': 1,
+    'timestamp': 1, 'triggered_by': 1
+}
+DECISION_LOG_PROJECTION = {
+    '_id': 1, 'decision_id': 1, 'trigger_sensor': 1, 'trigger_value': 1,
+    'condition': 1, 'actions': 1, 'timestamp': 1
+}
+# ISO 8601 (millisecond precision, as stored) for dates serialized server-side
+ISO_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%L'
+GATEWAY_LOG_PROJECTION = {
+    '_id': 1, 'device_id': 1, 'location': 1, 'timestamp': 1, 'original_count': 1,
+    'filtered_count': 1, 'outliers_detected': 1, 'outlier_details': 1
+}
+
+# Codec for bulk scans that only touch a few fields: documents stay raw
+# BSON and each field is decoded lazily on access
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+# Maximum number of memoized dashboard query results per manager
+QUERY_CACHE_SIZE = 128
+
+# Key of the sensor_rollups_1m coverage record in the rollup_state collection
+SENSOR_ROLLUPS_STATE_ID = 'sensor_rollups_1m'
+
+
+def _reading_rollup_group(group_id: Any) -> Dict[str, Any]:
+    """$group stage folding unwound readings into rollup fields (count, numeric_count, sum, min, max)"""
+    return {"$group": {
+        "_id": group_id,
+        "count": {"$sum": 1},
+        "numeric_count": {"$sum": {"$cond": [{"$isNumber": "$readings.value"}, 1, 0]}},
+        "sum": {"$sum": "$readings.value"},
+        "min": {"$min": "$readings.value"},
+        "max": {"$max": "$readings.value"}
+    }}
+
+
+def _raw_rollup_stages(start: datetime, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Stages rolling raw readings in [start, end) up per sensor_type, shaped like sensor_rollups_1m"""
+    timestamp: Dict[str, Any] = {"$gte": start}
+    if end is not None:
+        timestamp["$lt"] = end
+    return [
+        {"$match": {"timestamp": timestamp}},
+        {"$unwind": "$readings"},
+        _reading_rollup_group("$readings.sensor_type"),
+        {"$set": {"sensor_type": "$_id"}}
+    ]
+
+
+def _ttl_cached(method):
+    """Memoize a read-only query per argument set for `cache_ttl` seconds (results are shared: don't mutate them)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._query_cache.get(key)
+        if entry is None or now - entry[0] >= self.cache_ttl:
+            entry = (now, method(self, *args, **kwargs))
+            with self._cache_lock:
+                if key not in self._query_cache and len(self._query_cache) >= QUERY_CACHE_SIZE:
+                    self._query_cache.pop(next(iter(self._query_cache)))
+                self._query_cache[key] = entry
+        
+        # Results come back JSON-ready from the aggregation and callers only serialize
+        # them, so every caller within the TTL gets the same object without copying
+        return entry[1]
+    return wrapper
+
+
 class DatabaseManager:
     """Manages MongoDB connections and operations"""
     
-    def __init__(self, uri: str, database_name: str):
+    def __init__(
+        self,
+        uri: str,
+        database_name: str,
+        batch_size: int = 1000,
+        flush_interval: float = 0.2,
+        retention_days: int = 30,
+        cache_ttl: float = 5.0,
+        max_pool_size: int = 200,
+        min_pool_size: int = 20,
+        compressors: str = 'zlib',
+        socket_timeout_ms: int = 30000,
+        write_ack_not_required: bool = False
+    ):
         """Initialize database connection"""
-        self.client: MongoClient = MongoClient(uri)
+        # zlib ships with Python; 'zstd' and 'snappy' need the zstandard and
+        # python-snappy packages (pymongo warns and skips them when missing)
+        self.client: MongoClient = MongoClient(
+            uri,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            compressors=compressors,
+            retryWrites=True,
+            w=0 if write_ack_not_required else 1,
+            socketTimeoutMS=socket_timeout_ms
+        )
         self.db: Database = self.client[database_name]
+        self.retention_days = retention_days
         
-        # Collections
+        # Collections (append-only, timestamped logs are time-series where possible)
+        self.timeseries_collections = {
+            name for name, meta_field in TIMESERIES_COLLECTIONS.items()
+            if self._ensure_timeseries(name, meta_field)
+        }
         self.sensor_readings: Collection = self.db['sensor_readings']
         self.actuator_commands: Collection = self.db['actuator_commands']
         self.actuator_status: Collection = self.db['actuator_status']
         self.decision_logs: Collection = self.db['decision_logs']
         self.gateway_logs: Collection = self.db['gateway_logs']
         self.system_logs: Collection = self.db['system_logs']
+        self.sensor_rollups: Collection = self.db['sensor_rollups_1m']
+        self.rollup_state: Collection = self.db['rollup_state']
+        self.raw_sensor_readings: Collection = self.sensor_readings.with_options(
+            codec_options=RAW_CODEC_OPTIONS
+        )
+        
+        # Write buffers for batched inserts (flushed by size or timer)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # seconds
+        self._buffers: Dict[str, deque] = {
+            'sensor_readings': deque(),
+            'actuator_commands': deque(),
+            'decision_logs': deque(),
+            'gateway_logs': deque()
+        }
+        self._buffer_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        
+        # Flush targets inherit the client's write concern: acknowledged by default,
+        # fire-and-forget (w=0, pipelined OP_MSG) only with write_ack_not_required
+        self._buffer_targets: Dict[str, Collection] = {
+            'sensor_readings': self.sensor_readings,
+            'actuator_commands': self.actuator_commands,
+            'decision_logs': self.decision_logs,
+            'gateway_logs': self.gateway_logs
+        }
+        
+        # Worker threads for dispatching independent queries concurrently
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='db')
+        
+        # Short-lived cache for dashboard queries polled in bursts
+        self.cache_ttl = cache_ttl  # seconds; 0 disables
+        self._query_cache: Dict[tuple, tuple] = {}
+        self._cache_lock = threading.Lock()
         
         # Create indexes
         self._create_indexes()
         
         logger.info(f"Connected to MongoDB database: {database_name}")
     
+    def _ensure_timeseries(self, name: str, meta_field: str) -> bool:
+        """Create a collection as time-series if it does not exist yet; True if it is one"""
+        existing = next(self.db.list_collections(filter={'name': name}), None)
+        if existing is None:
+            self.db.create_collection(
+                name,
+                timeseries={
+                    'timeField': 'timestamp',
+                    'metaField': meta_field,
+                    'granularity': 'minutes'
+                },
+                expireAfterSeconds=self.retention_days * 86400
+            )
+            logger.info(f"Created time-series collection {name}")
+            return True
+        
+        # An existing regular collection cannot be converted in place
+        return existing.get('type') == 'timeseries'
+    
     def _create_indexes(self):
         """Create database indexes for performance"""
-        # Sensor readings indexes
-        self.sensor_readings.create_index([('timestamp', DESCENDING)])
-        self.sensor_readings.create_index([('sensor_id', 1), ('timestamp', DESCENDING)])
+        # TTL indexes on timestamp: MongoDB expires documents older than the
+        # retention window in the background (also serves timestamp sorts);
+        # time-series collections expire through their own expireAfterSeconds
+        ttl_seconds = self.retention_days * 86400
+        ttl_collections = [
+            collection
+            for collection in (self.sensor_readings, self.actuator_commands, self.decision_logs, self.gateway_logs)
+            if collection.name not in self.timeseries_collections
+        ]
+        for collection in ttl_collections:
+            collection.create_index(
+                [('timestamp', 1)],
+                name='timestamp_ttl',
+                expireAfterSeconds=ttl_seconds
+            )
+        
+        # Sensor readings indexes (sensor_id + location serves both the
+        # sensor_id-only and the combined filters of get_recent_sensor_readings)
+        self.sensor_readings.create_index([('sensor_id', 1), ('location', 1), ('timestamp', DESCENDING)])
         self.sensor_readings.create_index([('location', 1), ('timestamp', DESCENDING)])
+        self.sensor_readings.create_index([('sensor_type', 1), ('location', 1), ('timestamp', DESCENDING)])
         
         # Actuator commands indexes
-        self.actuator_commands.create_index([('timestamp', DESCENDING)])
         self.actuator_commands.create_index([('actuator_id', 1), ('timestamp', DESCENDING)])
+        # Covers get_actuator_usage: the windowed $match and both $group keys
+        self.actuator_commands.create_index([('timestamp', DESCENDING), ('actuator_id', 1), ('state', 1)])
         
-        # Decision logs indexes
-        self.decision_logs.create_index([('timestamp', DESCENDING)])
+        # Per-minute rollups expire with the raw readings they summarize
+        self.sensor_rollups.create_index(
+            [('minute', 1)],
+            name='minute_ttl',
+            expireAfterSeconds=ttl_seconds
+        )
+        
+        # Drop indexes superseded by the ones above
+        for collection, name in (
+            (self.sensor_readings, 'sensor_id_1_timestamp_-1'),
+            (self.sensor_readings, 'timestamp_-1'),
+            (self.actuator_commands, 'timestamp_-1'),
+            (self.decision_logs, 'timestamp_-1')
+        ):
+            if name in collection.index_information():
+                collection.drop_index(name)
         
         logger.info("Database indexes created")
     
     def store_sensor_reading(self, reading_data: Dict[str, Any]) -> str:
         """Store a sensor reading"""
-        result = self.sensor_readings.insert_one(reading_data)
-        return str(result.inserted_id)
+        oid = reading_data.setdefault('_id', ObjectId())
+        self.sensor_readings.insert_one(reading_data)
+        return str(oid)
     
     def store_sensor_group(self, group_data: Dict[str, Any]) -> str:
         """Store a group of sensor readings"""
-        result = self.sensor_readings.insert_one(group_data)
-        return str(result.inserted_id)
+        oid = group_data.setdefault('_id', ObjectId())
+        self.sensor_readings.insert_one(group_data)
+        return str(oid)
     
     def store_actuator_command(self, command_data: Dict[str, Any]) -> str:
         """Store an actuator command"""
-        result = self.actuator_commands.insert_one(command_data)
-        return str(result.inserted_id)
+        oid = command_data.setdefault('_id', ObjectId())
+        self.actuator_commands.insert_one(command_data)
+        return str(oid)
     
     def update_actuator_status(self, actuator_id: str, status_data: Dict[str, Any]):
         """Update actuator status"""
@@ -70,6 +289,20 @@ class DatabaseManager:
             upsert=True
         )
     
+    def update_actuator_statuses(self, updates: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Upsert many actuator statuses in one bulk write"""
+        # Last update per actuator wins; unordered ops may apply in any order
+        latest = dict(updates)
+        if not latest:
+            return
+        self.actuator_status.bulk_write(
+            [
+                UpdateOne({'actuator_id': actuator_id}, {'$set': status_data}, upsert=True)
+                for actuator_id, status_data in latest.items()
+            ],
+            ordered=False
+        )
+    
     def get_actuator_status(self, actuator_id: str) -> Optional[Dict[str, Any]]:
         """Get current actuator status"""
         return self.actuator_status.find_one({'actuator_id': actuator_id})
@@ -80,22 +313,86 @@ class DatabaseManager:
     
     def store_decision_log(self, decision_data: Dict[str, Any]) -> str:
         """Store a decision log"""
-        result = self.decision_logs.insert_one(decision_data)
-        return str(result.inserted_id)
+        oid = decision_data.setdefault('_id', ObjectId())
+        self.decision_logs.insert_one(decision_data)
+        return str(oid)
     
     def store_gateway_log(self, log_data: Dict[str, Any]) -> str:
         """Store a gateway processing log"""
-        result = self.gateway_logs.insert_one(log_data)
-        return str(result.inserted_id)
+        oid = log_data.setdefault('_id', ObjectId())
+        self.gateway_logs.insert_one(log_data)
+        return str(oid)
+    
+    def store_sensor_readings_batch(self, readings: Iterable[Dict[str, Any]]) -> List[str]:
+        """Buffer sensor readings/groups for a batched insert"""
+        return self._buffer('sensor_readings', readings)
+    
+    def store_actuator_commands_batch(self, commands: Iterable[Dict[str, Any]]) -> List[str]:
+        """Buffer actuator commands for a batched insert"""
+        return self._buffer('actuator_commands', commands)
+    
+    def store_decision_logs_batch(self, decisions: Iterable[Dict[str, Any]]) -> List[str]:
+        """Buffer decision logs for a batched insert"""
+        return self._buffer('decision_logs', decisions)
+    
+    def store_gateway_logs_batch(self, logs: Iterable[Dict[str, Any]]) -> List[str]:
+        """Buffer gateway logs for a batched insert"""
+        return self._buffer('gateway_logs', logs)
+    
+    def _buffer(self, collection_name: str, documents: Iterable[Dict[str, Any]]) -> List[str]:
+        """Queue documents and flush when the batch is full, else arm the flush timer"""
+        # Assign ids up front so callers get them without waiting for the flush
+        documents = list(documents)
+        ids = [str(document.setdefault('_id', ObjectId())) for document in documents]
+        with self._buffer_lock:
+            buffer = self._buffers[collection_name]
+            buffer.extend(documents)
+            full = len(buffer) >= self.batch_size
+            if not full and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if full:
+            self._flush_collection(collection_name)
+        return ids
+    
+    def _flush_collection(self, collection_name: str):
+        """Write out everything buffered for one collection with insert_many"""
+        with self._buffer_lock:
+            buffer = self._buffers[collection_name]
+            documents = list(buffer)
+            buffer.clear()
+        if not documents:
+            return
+        collection = self._buffer_targets[collection_name]
+        try:
+            # pymongo rejects bypass_document_validation on unacknowledged writes
+            collection.insert_many(
+                documents,
+                ordered=False,
+                bypass_document_validation=collection.write_concern.acknowledged
+            )
+        except Exception as e:
+            logger.error(f"Batched insert into {collection_name} failed ({len(documents)} docs): {e}")
+    
+    def flush(self):
+        """Flush all write buffers"""
+        with self._buffer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        for collection_name in self._buffers:
+            self._flush_collection(collection_name)
     
     def get_recent_sensor_readings(
         self, 
         sensor_id: Optional[str] = None,
         location: Optional[str] = None,
         minutes: int = 10,
-        limit: int = 100
+        limit: int = 100,
+        projection: Optional[Dict[str, int]] = SENSOR_READING_PROJECTION
     ) -> List[Dict[str, Any]]:
-        """Get recent sensor readings"""
+        """Get recent sensor readings (newest first)"""
         query = {}
         if sensor_id:
             query['sensor_id'] = sensor_id
@@ -108,7 +405,7 @@ class DatabaseManager:
         
         return list(
             self.sensor_readings
-            .find(query)
+            .find(query, projection)
             .sort('timestamp', DESCENDING)
             .limit(limit)
         )
@@ -127,9 +424,22 @@ class DatabaseManager:
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         query['timestamp'] = {'$gte': cutoff_time}
         
-        readings = list(self.sensor_readings.find(query))
+        # Only numeric values feed avg/min/max; count falls back to all matches
+        numeric_value = {"$cond": [{"$isNumber": "$value"}, "$value", None]}
+        pipeline = [
+            {"$match": query},
+            {"$group": {
+                "_id": None,
+                "matched": {"$sum": 1},
+                "count": {"$sum": {"$cond": [{"$isNumber": "$value"}, 1, 0]}},
+                "avg": {"$avg": numeric_value},
+                "min": {"$min": numeric_value},
+                "max": {"$max": numeric_value}
+            }}
+        ]
+        result = next(self.sensor_readings.aggregate(pipeline), None)
         
-        if not readings:
+        if not result:
             return {
                 'count': 0,
                 'avg': None,
@@ -137,39 +447,48 @@ class DatabaseManager:
                 'max': None
             }
         
-        values = [r.get('value') for r in readings if isinstance(r.get('value'), (int, float))]
-        
-        if not values:
+        if not result['count']:
             return {
-                'count': len(readings),
+                'count': result['matched'],
                 'avg': None,
                 'min': None,
                 'max': None
             }
         
         return {
-            'count': len(values),
-            'avg': sum(values) / len(values),
-            'min': min(values),
-            'max': max(values)
+            'count': result['count'],
+            'avg': result['avg'],
+            'min': result['min'],
+            'max': result['max']
         }
     
-    def get_recent_decisions(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get recent decision logs"""
-        return list(
-            self.decision_logs
-            .find()
-            .sort('timestamp', DESCENDING)
-            .limit(limit)
-        )
+    @_ttl_cached
+    def get_recent_decisions(
+        self,
+        limit: int = 50,
+        projection: Optional[Dict[str, int]] = DECISION_LOG_PROJECTION
+    ) -> List[Dict[str, Any]]:
+        """Get recent decision logs with _id and timestamp already converted to strings"""
+        pipeline = [
+            {'$sort': {'timestamp': DESCENDING}},
+            {'$limit': limit}
+        ]
+        if projection:
+            pipeline.append({'$project': projection})
+        pipeline.append({'$addFields': {
+            '_id': {'$toString': '$_id'},
+            'timestamp': {'$dateToString': {'date': '$timestamp', 'format': ISO_DATE_FORMAT}}
+        }})
+        return list(self.decision_logs.aggregate(pipeline))
     
     def get_actuator_history(
         self,
         actuator_id: str,
         hours: int = 24,
-        limit: int = 100
+        limit: int = 100,
+        projection: Optional[Dict[str, int]] = ACTUATOR_HISTORY_PROJECTION
     ) -> List[Dict[str, Any]]:
-        """Get actuator command history"""
+        """Get actuator command history (newest first)"""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
         return list(
@@ -177,22 +496,31 @@ class DatabaseManager:
             .find({
                 'actuator_id': actuator_id,
                 'timestamp': {'$gte': cutoff_time}
-            })
+            }, projection)
             .sort('timestamp', DESCENDING)
             .limit(limit)
         )
     
+    @_ttl_cached
     def get_gateway_statistics(self, hours: int = 24) -> Dict[str, Any]:
         """Get gateway filtering statistics"""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
-        logs = list(self.gateway_logs.find({
-            'timestamp': {'$gte': cutoff_time}
-        }))
+        outliers = {"$ifNull": ["$outliers_detected", 0]}
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": cutoff_time}}},
+            {"$group": {
+                "_id": None,
+                "total_processed": {"$sum": 1},
+                "batches_with_outliers": {"$sum": {"$cond": [{"$gt": [outliers, 0]}, 1, 0]}},
+                "total_outliers": {"$sum": outliers}
+            }}
+        ]
+        result = next(self.gateway_logs.aggregate(pipeline), None) or {}
         
-        total_processed = len(logs)
-        outliers_detected = sum(1 for log in logs if log.get('outliers_detected', 0) > 0)
-        total_outliers = sum(log.get('outliers_detected', 0) for log in logs)
+        total_processed = result.get('total_processed', 0)
+        outliers_detected = result.get('batches_with_outliers', 0)
+        total_outliers = result.get('total_outliers', 0)
         
         return {
             'total_processed': total_processed,
@@ -201,81 +529,182 @@ class DatabaseManager:
             'filter_rate': (total_outliers / total_processed) if total_processed > 0 else 0
         }
     
+    def gather(self, *calls: Callable[[], Any]) -> List[Any]:
+        """Run independent queries concurrently and return their results in order"""
+        futures = [self._executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+    
     def cleanup_old_data(self, days: int = 30):
-        """Remove data older than specified days"""
+        """Remove data older than specified days (manual override; TTL indexes normally do this)"""
         cutoff_time = datetime.utcnow() - timedelta(days=days)
+        old_data = {'timestamp': {'$lt': cutoff_time}}
         
-        # Clean sensor readings
-        result = self.sensor_readings.delete_many({'timestamp': {'$lt': cutoff_time}})
-        logger.info(f"Deleted {result.deleted_count} old sensor readings")
-        
-        # Clean actuator commands
-        result = self.actuator_commands.delete_many({'timestamp': {'$lt': cutoff_time}})
-        logger.info(f"Deleted {result.deleted_count} old actuator commands")
-        
-        # Clean decision logs
-        result = self.decision_logs.delete_many({'timestamp': {'$lt': cutoff_time}})
-        logger.info(f"Deleted {result.deleted_count} old decision logs")
-        
-        # Clean gateway logs
-        result = self.gateway_logs.delete_many({'timestamp': {'$lt': cutoff_time}})
-        logger.info(f"Deleted {result.deleted_count} old gateway logs")
+        # Delete from each collection concurrently
+        collections = {
+            'sensor readings': self.sensor_readings,
+            'actuator commands': self.actuator_commands,
+            'decision logs': self.decision_logs,
+            'gateway logs': self.gateway_logs
+        }
+        futures = {
+            label: self._executor.submit(collection.delete_many, old_data)
+            for label, collection in collections.items()
+        }
+        for label, future in futures.items():
+            try:
+                logger.info(f"Deleted {future.result().deleted_count} old {label}")
+            except OperationFailure as e:
+                # Deleting from a time-series collection by timestamp needs MongoDB 7.0+
+                if collections[label].name not in self.timeseries_collections:
+                    raise
+                logger.warning(
+                    f"Could not delete old {label} (time-series deletes by timestamp need MongoDB 7.0+; "
+                    f"documents still expire after {self.retention_days} days): {e}"
+                )
+    
+    def _count_all(self, collection: Collection) -> int:
+        """Number of documents in a collection"""
+        # Collection metadata of a time-series collection counts buckets, not documents
+        if collection.name in self.timeseries_collections:
+            return collection.count_documents({})
+        return collection.estimated_document_count()
     
+    @_ttl_cached
     def get_system_overview(self) -> Dict[str, Any]:
         """Get system overview statistics"""
         now = datetime.utcnow()
-        last_hour = now - timedelta(hours=1)
+        last_hour = {'timestamp': {'$gte': now - timedelta(hours=1)}}
         
-        return {
-            'total_sensor_readings': self.sensor_readings.count_documents({}),
-            'readings_last_hour': self.sensor_readings.count_documents({
-                'timestamp': {'$gte': last_hour}
-            }),
-            'total_actuator_commands': self.actuator_commands.count_documents({}),
-            'commands_last_hour': self.actuator_commands.count_documents({
-                'timestamp': {'$gte': last_hour}
-            }),
-            'total_decisions': self.decision_logs.count_documents({}),
-            'decisions_last_hour': self.decision_logs.count_documents({
-                'timestamp': {'$gte': last_hour}
-            }),
-            'active_actuators': self.actuator_status.count_documents({}),
-            'timestamp': now
+        # Unfiltered totals of regular collections come from collection metadata;
+        # time-series totals and the last-hour counts need a real count. All run concurrently.
+        submit = self._executor.submit
+        futures = {
+            'total_sensor_readings': submit(self._count_all, self.sensor_readings),
+            'readings_last_hour': submit(self.sensor_readings.count_documents, last_hour),
+            'total_actuator_commands': submit(self._count_all, self.actuator_commands),
+            'commands_last_hour': submit(self.actuator_commands.count_documents, last_hour),
+            'total_decisions': submit(self._count_all, self.decision_logs),
+            'decisions_last_hour': submit(self.decision_logs.count_documents, last_hour),
+            'active_actuators': submit(self._count_all, self.actuator_status)
         }
+        overview = {name: future.result() for name, future in futures.items()}
+        overview['timestamp'] = now
+        return overview
     
-    def get_sensor_aggregate_summary(self, hours: int = 24) -> Dict[str, Any]:
-        """Aggregate statistics per sensor_type over the last N hours"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+    def _rollup_coverage(self) -> Optional[Tuple[datetime, datetime]]:
+        """[first, end) minutes sensor_rollups_1m holds completely; None before the first refresh"""
+        state = self.rollup_state.find_one({'_id': SENSOR_ROLLUPS_STATE_ID})
+        if state is None:
+            return None
+        return state['covered_from'], state['watermark']
+    
+    def refresh_sensor_rollups(self):
+        """Recompute per-minute sensor rollups into sensor_rollups_1m"""
+        now = datetime.utcnow()
+        # Only whole minutes are rolled up; the current one is still filling
+        watermark = now.replace(second=0, microsecond=0)
+        coverage = self._rollup_coverage()
+        if coverage is None:
+            # First refresh: backfill the whole retention window
+            covered_from = since = watermark - timedelta(days=self.retention_days)
+        else:
+            # Redo the previous minute too so late-arriving readings are counted
+            covered_from = coverage[0]
+            since = coverage[1] - timedelta(minutes=1)
+        
+        # Whole minutes are recomputed, so matched rollups are replaced outright
         pipeline = [
-            {"$match": {"timestamp": {"$gte": cutoff_time}}},
+            {"$match": {"timestamp": {"$gte": since, "$lt": watermark}}},
             {"$unwind": "$readings"},
+            _reading_rollup_group({
+                "t": {"$dateTrunc": {"date": "$timestamp", "unit": "minute"}},
+                "type": "$readings.sensor_type"
+            }),
+            {"$set": {"minute": "$_id.t", "sensor_type": "$_id.type"}},
+            {"$merge": {
+                "into": "sensor_rollups_1m",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }}
+        ]
+        self.sensor_readings.aggregate(pipeline)
+        
+        # Persisted so a restart resumes from here instead of re-backfilling
+        self.rollup_state.replace_one(
+            {'_id': SENSOR_ROLLUPS_STATE_ID},
+            {'covered_from': covered_from, 'watermark': watermark},
+            upsert=True
+        )
+    
+    @_ttl_cached
+    def get_sensor_aggregate_summary(self, hours: int = 24) -> Dict[str, Any]:
+        """Aggregate statistics per sensor_type over the last N hours (minute rollups plus raw edges)"""
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        coverage = self._rollup_coverage()
+        
+        # Rollups serve the whole minutes they cover after the cutoff; the partial
+        # cutoff minute, anything before the coverage and the minutes since the
+        # last refresh are rolled up from the raw readings, so counts stay exact
+        rollup_from = cutoff_time.replace(second=0, microsecond=0)
+        if rollup_from < cutoff_time:
+            rollup_from += timedelta(minutes=1)
+        if coverage is not None:
+            rollup_from = max(rollup_from, coverage[0])
+        if coverage is None or rollup_from >= coverage[1]:
+            collection = self.sensor_readings
+            pipeline = _raw_rollup_stages(cutoff_time)
+        else:
+            watermark = coverage[1]
+            collection = self.sensor_rollups
+            pipeline = [{"$match": {"minute": {"$gte": rollup_from, "$lt": watermark}}}]
+            raw_ranges = [(watermark, None)]
+            if cutoff_time < rollup_from:
+                raw_ranges.append((cutoff_time, rollup_from))
+            for start, end in raw_ranges:
+                pipeline.append({"$unionWith": {
+                    "coll": self.sensor_readings.name,
+                    "pipeline": _raw_rollup_stages(start, end)
+                }})
+        
+        pipeline += [
             {"$group": {
-                "_id": "$readings.sensor_type",
-                "count": {"$sum": 1},
-                "avg": {"$avg": "$readings.value"},
-                "min": {"$min": "$readings.value"},
-                "max": {"$max": "$readings.value"}
+                "_id": "$sensor_type",
+                "count": {"$sum": "$count"},
+                "numeric_count": {"$sum": "$numeric_count"},
+                "sum": {"$sum": "$sum"},
+                "min": {"$min": "$min"},
+                "max": {"$max": "$max"}
             }},
             {"$project": {
                 "sensor_type": "$_id",
                 "count": 1,
-                "avg": 1,
+                "avg": {"$cond": [
+                    {"$gt": ["$numeric_count", 0]},
+                    {"$divide": ["$sum", "$numeric_count"]},
+                    None
+                ]},
                 "min": 1,
                 "max": 1,
                 "_id": 0
             }}
         ]
-        return list(self.sensor_readings.aggregate(pipeline))
+        return list(collection.aggregate(pipeline))
 
     def get_actuator_usage(self, hours: int = 24) -> List[Dict[str, Any]]:
         """Usage frequency per actuator over the last N hours"""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        # Count per (actuator, state) first, then fold states into a list:
+        # one small group per pair instead of a growing set per actuator
         pipeline = [
             {"$match": {"timestamp": {"$gte": cutoff_time}}},
             {"$group": {
-                "_id": "$actuator_id",
-                "count": {"$sum": 1},
-                "states": {"$addToSet": "$state"}
+                "_id": {"actuator_id": "$actuator_id", "state": "$state"},
+                "count": {"$sum": 1}
+            }},
+            {"$group": {
+                "_id": "$_id.actuator_id",
+                "count": {"$sum": "$count"},
+                "states": {"$push": "$_id.state"}
             }},
             {"$project": {
                 "actuator_id": "$_id",
@@ -289,14 +718,18 @@ class DatabaseManager:
     def get_decision_summary(self, hours: int = 24) -> Dict[str, Any]:
         """Decision volume summary"""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        total = self.decision_logs.count_documents({})
+        total = self._count_all(self.decision_logs)
         recent = self.decision_logs.count_documents({"timestamp": {"$gte": cutoff_time}})
         return {"total": total, "last_hours": recent}
 
-    def get_recent_gateway_logs(self, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_recent_gateway_logs(
+        self,
+        limit: int = 50,
+        projection: Optional[Dict[str, int]] = GATEWAY_LOG_PROJECTION
+    ) -> List[Dict[str, Any]]:
         """Fetch recent gateway logs"""
         logs = list(
-            self.gateway_logs.find()
+            self.gateway_logs.find({}, projection)
             .sort('timestamp', DESCENDING)
             .limit(limit)
         )
@@ -308,5 +741,7 @@ class DatabaseManager:
 
     def close(self):
         """Close database connection"""
+        self.flush()
+        self._executor.shutdown(wait=True)
         self.client.close()
         logger.info("Database connection closed")
@@ -2,182 +2,230 @@
 Decision engine for IoT Smart Home system
 Implements intelligent automation rules
 """
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Callable, Final, List, Dict, Any, Optional, Sequence, Tuple
 import logging
-from collections import defaultdict
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
 
-from backend.models import ActuatorCommand
+import numpy as np
+
+from backend.models import ActuatorCommand, LazyReason
 from backend.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Handlers append commands straight into the caller's list via its bound append
+Emit = Callable[[ActuatorCommand], None]
+
+# Fixed (non-parametric) command reasons
+REASON_FIRE_SAFETY: Final[str] = 'Fire safety protocol'
+REASON_ENTRANCE_DOOR_OPENED: Final[str] = 'Entrance door opened'
+REASON_PRESSURE_MAT_PRESENCE: Final[str] = 'Presence detected on pressure mat'
+REASON_UNAUTHORIZED_ENTRY: Final[str] = 'Potential unauthorized entry detected'
+
+# Commands with these reasons win over any other command for the same actuator
+SAFETY_OVERRIDE_REASONS: Final = frozenset({REASON_FIRE_SAFETY})
+
+# Commit order of coalesced commands by actuator type (higher first, safety actuators lead)
+SALIENCE = {
+    'alarm': 100,
+    'valve': 90,
+    'switch': 80,
+    'appliance': 70,
+    'motor': 60,
+    'fan': 50,
+    'climate_control': 40,
+    'shutter': 20,
+    'light': 10
+}
+
+# HVAC aggregation weights (living areas more important than utility)
+LOCATION_WEIGHTS = {
+    'living_room': 1.5,
+    'bedroom': 1.5,
+    'kitchen': 1.0,
+    'roof': 0.5,
+    'basement': 0.3
+}
+
+# Rule order of each sensor's entry in DecisionEngine._thr
+THRESHOLD_TUPLE_ORDER = {
+    'temperature': ('low_threshold', 'high_threshold', 'critical_high'),
+    'humidity': ('low_threshold', 'high_threshold'),
+    'light': ('dark_threshold', 'bright_threshold'),
+    'co2': ('warning_threshold', 'critical_threshold'),
+    'gas': ('warning_threshold', 'critical_threshold'),
+    'distance': ('critical_threshold', 'obstacle_threshold'),
+    'sound': ('warning_threshold', 'critical_threshold'),
+    'vibration': ('critical_threshold',),
+    'energy': ('high_threshold', 'critical_threshold'),
+    'uv': ('high_threshold',)
+}
+
+# Queued history batches that force a flush even without a history read
+HISTORY_FLUSH_THRESHOLD = 256
+
+# Seconds between sweeps for sensors that stopped reporting
+HISTORY_PRUNE_INTERVAL = 300
+
+# Temperature locations per HVAC decision before the NumPy reduction beats the scalar loop
+VECTORIZE_MIN_TEMPERATURES = 16
+
 class DecisionEngine:
     """Intelligent decision making engine for smart home automation"""
     
     def __init__(self):
         """Initialize decision engine"""
-        self.rules = Config.DECISION_RULES
-        self.sensor_history = defaultdict(list)
-        self.last_motion_time = {}
+        self.thresholds = Config.THRESHOLDS
+        # Bounded per-sensor history keyed by (device_id, sensor_type): (value, time.monotonic()) tuples
+        maxlen = Config.HISTORY_MAXLEN
+        self.sensor_history: Dict[Tuple[str, str], deque] = defaultdict(lambda: deque(maxlen=maxlen))
+        self._pending_history = deque()  # (device_id, [(sensor_type, value)], monotonic time) not yet applied
+        # Latest temperature per device (device_id -> (value, time.monotonic())), least recently updated first
+        self._latest_temperature: OrderedDict = OrderedDict()
+        self.last_motion_time = {}  # location -> time.monotonic() of last motion
         self.actuator_states = {}
-        self.alert_cooldown = {}  # Prevent alert spam
+        self.alert_cooldown = {}  # Prevent alert spam (alert_id -> time.monotonic())
         self.manual_override = {}  # Track manually controlled actuators
         self.manual_override_timeout = 3600  # 1 hour in seconds
+        self._clock = time.monotonic()  # clock snapshot for the message being processed
+        self._last_history_prune = self._clock
+        # Serializes the public entry points: handlers share the per-call clock
+        # snapshot and cross-location state (HVAC aggregation, cooldowns)
+        self._lock = threading.RLock()
+        
+        # Light actuator per location, resolved once from the co-located actuator index
+        self._light_id_by_location = {
+            location: actuator_id
+            for location, actuator_ids in Config.ACTUATORS_BY_LOCATION.items()
+            for actuator_id in actuator_ids
+            if Config.ACTUATORS[actuator_id]['type'] == 'light'
+        }
+        
+        # Per-sensor-type decision handlers, all called as (value, location, reading)
+        self._handlers = {
+            'humidity': self._process_humidity,
+            'light': self._process_light,
+            'motion': self._process_motion,
+            'co2': self._process_co2,
+            'gas': self._process_gas,
+            'smoke': self._process_smoke,
+            'distance': self._process_distance,
+            'water_leak': self._process_water_leak,
+            'door_sensor': self._process_door_sensor,
+            'sound': self._process_sound,
+            'vibration': self._process_vibration,
+            'energy': self._process_energy,
+            'uv': self._process_uv,
+            'rain': self._process_rain,
+            'glass_break': self._process_glass_break,
+            'pressure_mat': self._process_pressure_mat
+        }
+        
+        # Per-sensor thresholds as flat tuples, unpacked once per handler call
+        thresholds = self.thresholds
+        self._thr = {
+            sensor_type: tuple(thresholds[(sensor_type, rule)] for rule in rules)
+            for sensor_type, rules in THRESHOLD_TUPLE_ORDER.items()
+        }
         
+        # Cross-sensor rules, keyed by the only locations they apply to
+        self._cross_sensor_handlers = {
+            'kitchen': self._kitchen_cross,
+            'entrance': self._entrance_cross
+        }
+    
     def process_sensor_data(self, sensor_data: Dict[str, Any]) -> List[ActuatorCommand]:
         """
         Process sensor data and make decisions
         Returns list of actuator commands to execute
         """
-        commands = []
-        
-        # Extract sensor information
         device_id = sensor_data.get('device_id')
         location = sensor_data.get('location')
         readings = sensor_data.get('readings', [])
-        
-        # Store in history for trend analysis
-        self._update_history(device_id, readings)
-        
-        # Collect all temperature readings (don't process individually)
-        temp_readings = []
-        
-        # Process each reading
-        for reading in readings:
-            sensor_type = reading.get('sensor_type')
-            value = reading.get('value')
+        # Column views of the readings; handlers still get the full reading for extra fields
+        sensor_types = [r['sensor_type'] for r in readings]
+        values = [r['value'] for r in readings]
+        
+        with self._lock:
+            commands = []
+            self._clock = now = time.monotonic()
+            emit = commands.append
             
-            # Route to appropriate decision logic
-            if sensor_type == 'temperature':
-                # Collect temperature readings instead of processing immediately
-                temp_readings.append({'value': value, 'location': location})
-            elif sensor_type == 'humidity':
-                commands.extend(self._process_humidity(value, location))
-            elif sensor_type == 'light':
-                commands.extend(self._process_light(value, location))
-            elif sensor_type == 'motion':
-                commands.extend(self._process_motion(value, location))
-            elif sensor_type == 'co2':
-                commands.extend(self._process_co2(value, location))
-            elif sensor_type == 'gas':
-                commands.extend(self._process_gas(value, location))
-            elif sensor_type == 'smoke':
-                commands.extend(self._process_smoke(value, location))
-            elif sensor_type == 'distance':
-                commands.extend(self._process_distance(value, location, reading))
-            elif sensor_type == 'water_leak':
-                commands.extend(self._process_water_leak(value, location))
-            elif sensor_type == 'door_sensor':
-                commands.extend(self._process_door_sensor(value, location))
-            elif sensor_type == 'sound':
-                commands.extend(self._process_sound(value, location))
-            elif sensor_type == 'vibration':
-                commands.extend(self._process_vibration(value, location))
-            elif sensor_type == 'energy':
-                commands.extend(self._process_energy(value, location))
-            elif sensor_type == 'uv':
-                commands.extend(self._process_uv(value, location))
-            elif sensor_type == 'rain':
-                commands.extend(self._process_rain(value, location))
-            elif sensor_type == 'glass_break':
-                commands.extend(self._process_glass_break(value, location))
-            elif sensor_type == 'pressure_mat':
-                commands.extend(self._process_pressure_mat(value, location))
-        
-        # Process aggregated temperature readings (after collecting from all sensors)
-        if temp_readings:
-            # Get all recent temperature readings from history across all locations
-            all_temps = self._get_all_recent_temperatures()
-            # Make a single HVAC decision based on aggregated data
-            commands.extend(self._process_aggregated_temperature(all_temps))
-        
-        # Cross-sensor intelligence (combine multiple sensor inputs)
-        commands.extend(self._cross_sensor_decisions(device_id, location, readings))
-        
-        return commands
+            # Store in history for trend analysis
+            self._update_history(device_id, sensor_types, values, now)
+            
+            # Temperature readings are not processed individually (see _process_aggregated_temperature)
+            has_temperature = False
+            
+            # Process each reading
+            get_handler = self._handlers.get
+            for sensor_type, value, reading in zip(sensor_types, values, readings):
+                # Route to appropriate decision logic
+                if sensor_type == 'temperature':
+                    has_temperature = True
+                    continue
+                handler = get_handler(sensor_type)
+                if handler:
+                    handler(value, location, reading, emit)
+            
+            # Process aggregated temperature readings (after collecting from all sensors)
+            if has_temperature:
+                # Get all recent temperature readings from history across all locations
+                all_temps = self._get_all_recent_temperatures(now)
+                # Make a single HVAC decision based on aggregated data
+                self._process_aggregated_temperature(all_temps, emit)
+            
+            # Cross-sensor intelligence (combine multiple sensor inputs)
+            self._cross_sensor_decisions(device_id, location, sensor_types, values, emit)
+            
+            return self._coalesce(commands)
     
-    def _process_temperature(self, temp: float, location: str) -> List[ActuatorCommand]:
-        """Process temperature readings with hysteresis to prevent oscillation"""
-        commands = []
-        rules = self.rules['temperature']
-        current_state = self.actuator_states.get('hvac_system', 'off')
-        
-        # Hysteresis buffer (deadband) in degrees
-        HYSTERESIS = 2.0
-        
-        # Critical high temperature
-        if temp >= rules['critical_high']:
-            commands.append(ActuatorCommand(
-                actuator_id='hvac_system',
-                actuator_type='climate_control',
-                state='cooling',
-                reason=f'Critical high temperature: {temp}°C at {location}'
-            ))
-            commands.append(ActuatorCommand(
-                actuator_id='fire_alarm',
-                actuator_type='alarm',
-                state='on',
-                reason=f'Temperature critically high: {temp}°C'
-            ))
-        
-        # High temperature - turn on cooling (only if not already cooling)
-        elif temp > rules['high_threshold']:
-            if current_state != 'cooling':
-                commands.append(ActuatorCommand(
-                    actuator_id='hvac_system',
-                    actuator_type='climate_control',
-                    state='cooling',
-                    reason=f'High temperature: {temp}°C at {location}'
-                ))
-        
-        # Temperature dropped below (high_threshold - hysteresis) - turn off cooling
-        elif temp <= (rules['high_threshold'] - HYSTERESIS) and current_state == 'cooling':
-            commands.append(ActuatorCommand(
-                actuator_id='hvac_system',
-                actuator_type='climate_control',
-                state='off',
-                reason=f'Temperature cooled to {temp}°C at {location}'
-            ))
-        
-        # Low temperature - turn on heating (only if not already heating)
-        elif temp < rules['low_threshold']:
-            if current_state != 'heating':
-                commands.append(ActuatorCommand(
-                    actuator_id='hvac_system',
-                    actuator_type='climate_control',
-                    state='heating',
-                    reason=f'Low temperature: {temp}°C at {location}'
-                ))
-        
-        # Temperature rose above (low_threshold + hysteresis) - turn off heating
-        elif temp >= (rules['low_threshold'] + HYSTERESIS) and current_state == 'heating':
-            commands.append(ActuatorCommand(
-                actuator_id='hvac_system',
-                actuator_type='climate_control',
-                state='off',
-                reason=f'Temperature warmed to {temp}°C at {location}'
-            ))
-        
-        return commands
+    def _coalesce(self, commands: List[ActuatorCommand]) -> List[ActuatorCommand]:
+        """
+        Keep one command per actuator (a safety override, else the last one), drop
+        state-only commands that change nothing and order the rest by salience
+        """
+        if not commands:
+            return commands
+        overrides = {c.actuator_id: c for c in commands if c.reason in SAFETY_OVERRIDE_REASONS}
+        states = self.actuator_states
+        seen = set()
+        kept = []
+        for command in reversed(commands):
+            actuator_id = command.actuator_id
+            if actuator_id in seen:
+                continue
+            seen.add(actuator_id)
+            if overrides:
+                command = overrides.get(actuator_id, command)
+            # Commands carrying a value (e.g. brightness) may still change the actuator
+            if command.value is None and states.get(actuator_id) == command.state:
+                continue
+            kept.append(command)
+        kept.reverse()
+        if len(kept) > 1:
+            # Stable: emission order is kept within a salience level
+            kept.sort(key=lambda c: -SALIENCE.get(c.actuator_type, 0))
+        return kept
     
-    def _process_humidity(self, humidity: float, location: str) -> List[ActuatorCommand]:
+    def _process_humidity(self, humidity: float, location: str, reading: Dict, emit: Emit) -> None:
         """Process humidity readings"""
-        commands = []
-        rules = self.rules['humidity']
+        low, high = self._thr['humidity']
         
         # High humidity
-        if humidity > rules['high_threshold']:
+        if humidity > high:
             if location == 'basement':
-                commands.append(ActuatorCommand(
+                emit(ActuatorCommand(
                     actuator_id='dehumidifier',
                     actuator_type='appliance',
                     state='on',
-                    reason=f'High humidity: {humidity}% at {location}'
+                    reason=LazyReason('High humidity: {}% at {}', humidity, location)
                 ))
         
         # Low humidity
-        elif humidity < rules['low_threshold']:
+        elif humidity < low:
             # Could add humidifier control here
             pass
         
@@ -186,143 +234,126 @@ class DecisionEngine:
             if location == 'basement':
                 current_state = self.actuator_states.get('dehumidifier', 'off')
                 if current_state == 'on':
-                    commands.append(ActuatorCommand(
+                    emit(ActuatorCommand(
                         actuator_id='dehumidifier',
                         actuator_type='appliance',
                         state='off',
-                        reason=f'Humidity normalized: {humidity}% at {location}'
+                        reason=LazyReason('Humidity normalized: {}% at {}', humidity, location)
                     ))
-        
-        return commands
     
-    def _process_light(self, light_level: float, location: str) -> List[ActuatorCommand]:
+    def _process_light(self, light_level: float, location: str, reading: Dict, emit: Emit) -> None:
         """Process light sensor readings"""
-        commands = []
-        rules = self.rules['light']
+        dark, bright = self._thr['light']
         
         # Check for recent motion (but allow automation without motion too)
-        has_recent_motion = self._has_recent_motion(location)
+        has_recent_motion = self._has_recent_motion(location, self._clock)
         
-        if light_level < rules['dark_threshold']:
+        if light_level < dark:
             # Dark - turn on lights (prioritize motion, but work without it too)
-            light_id = f'{location}_lights'
-            if light_id in Config.ACTUATORS:
-                reason = f'Dark environment: {light_level} lux'
-                if has_recent_motion:
-                    reason += ' with motion'
-                reason += f' at {location}'
-                
-                commands.append(ActuatorCommand(
+            light_id = self._light_id_by_location.get(location)
+            if light_id is not None:
+                template = 'Dark environment: {} lux with motion at {}' if has_recent_motion else 'Dark environment: {} lux at {}'
+                emit(ActuatorCommand(
                     actuator_id=light_id,
                     actuator_type='light',
                     state='on',
                     value=80,  # 80% brightness
-                    reason=reason
+                    reason=LazyReason(template, light_level, location)
                 ))
         
-        elif light_level > rules['bright_threshold']:
+        elif light_level > bright:
             # Bright - turn off lights to save energy
-            light_id = f'{location}_lights'
-            if light_id in Config.ACTUATORS:
+            light_id = self._light_id_by_location.get(location)
+            if light_id is not None:
                 current_state = self.actuator_states.get(light_id, 'off')
                 if current_state == 'on':
-                    commands.append(ActuatorCommand(
+                    emit(ActuatorCommand(
                         actuator_id=light_id,
                         actuator_type='light',
                         state='off',
-                        reason=f'Bright environment: {light_level} lux at {location}'
+                        reason=LazyReason('Bright environment: {} lux at {}', light_level, location)
                     ))
-        
-        return commands
     
-    def _process_motion(self, motion: int, location: str) -> List[ActuatorCommand]:
+    def _process_motion(self, motion: int, location: str, reading: Dict, emit: Emit) -> None:
         """Process motion sensor readings"""
-        commands = []
-        
         if motion == 1:
             # Motion detected
-            self.last_motion_time[location] = datetime.utcnow()
+            self.last_motion_time[location] = self._clock
             
             # Turn on lights if dark
-            light_id = f'{location}_lights'
-            if light_id in Config.ACTUATORS:
+            light_id = self._light_id_by_location.get(location)
+            if light_id is not None:
                 # Check if it's dark
                 recent_light = self._get_recent_sensor_value(location, 'light')
-                if recent_light is not None and recent_light < self.rules['light']['dark_threshold']:
-                    commands.append(ActuatorCommand(
+                if recent_light is not None and recent_light < self._thr['light'][0]:
+                    emit(ActuatorCommand(
                         actuator_id=light_id,
                         actuator_type='light',
                         state='on',
                         value=80,
-                        reason=f'Motion detected in dark area at {location}'
+                        reason=LazyReason('Motion detected in dark area at {}', location)
                     ))
         
         else:
             # No motion - check if we should turn off lights
-            self._check_motion_timeout(location, commands)
-        
-        return commands
+            self._check_motion_timeout(location, self._clock, emit)
     
-    def _process_co2(self, co2_level: float, location: str) -> List[ActuatorCommand]:
+    def _process_co2(self, co2_level: float, location: str, reading: Dict, emit: Emit) -> None:
         """Process CO2 sensor readings"""
-        commands = []
-        rules = self.rules['co2']
+        warning, critical = self._thr['co2']
         
-        if co2_level > rules['critical_threshold']:
+        if co2_level > critical:
             # Critical CO2 level
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='hvac_system',
                 actuator_type='climate_control',
                 state='fan_only',
-                reason=f'Critical CO2 level: {co2_level} ppm at {location}'
+                reason=LazyReason('Critical CO2 level: {} ppm at {}', co2_level, location)
             ))
             if location == 'kitchen':
-                commands.append(ActuatorCommand(
+                emit(ActuatorCommand(
                     actuator_id='kitchen_exhaust',
                     actuator_type='fan',
                     state='high',
-                    reason=f'Critical CO2 level: {co2_level} ppm'
+                    reason=LazyReason('Critical CO2 level: {} ppm', co2_level)
                 ))
         
-        elif co2_level > rules['warning_threshold']:
+        elif co2_level > warning:
             # Warning CO2 level - increase ventilation
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='hvac_system',
                 actuator_type='climate_control',
                 state='fan_only',
-                reason=f'Elevated CO2 level: {co2_level} ppm at {location}'
+                reason=LazyReason('Elevated CO2 level: {} ppm at {}', co2_level, location)
             ))
-        
-        return commands
     
-    def _process_gas(self, gas_level: float, location: str) -> List[ActuatorCommand]:
+    def _process_gas(self, gas_level: float, location: str, reading: Dict, emit: Emit) -> None:
         """Process gas sensor readings"""
-        commands = []
-        rules = self.rules['gas']
+        warning, critical = self._thr['gas']
         
-        if gas_level > rules['critical_threshold']:
+        if gas_level > critical:
             # Critical gas level - sound alarm (no cooldown for safety)
             current_alarm_state = self.actuator_states.get('gas_alarm', 'off')
             if current_alarm_state != 'on':
-                commands.append(ActuatorCommand(
+                emit(ActuatorCommand(
                     actuator_id='gas_alarm',
                     actuator_type='alarm',
                     state='on',
-                    reason=f'Critical gas level: {gas_level} ppm at {location}'
+                    reason=LazyReason('Critical gas level: {} ppm at {}', gas_level, location)
                 ))
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='kitchen_exhaust',
                 actuator_type='fan',
                 state='high',
-                reason=f'Emergency ventilation for gas: {gas_level} ppm'
+                reason=LazyReason('Emergency ventilation for gas: {} ppm', gas_level)
             ))
-        elif gas_level > rules['warning_threshold']:
+        elif gas_level > warning:
             # Warning level
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='kitchen_exhaust',
                 actuator_type='fan',
                 state='medium',
-                reason=f'Elevated gas level: {gas_level} ppm at {location}'
+                reason=LazyReason('Elevated gas level: {} ppm at {}', gas_level, location)
             ))
         else:
             # Normal gas level - turn off alarm and exhaust
@@ -330,436 +361,421 @@ class DecisionEngine:
             current_exhaust_state = self.actuator_states.get('kitchen_exhaust', 'off')
             
             if current_alarm_state == 'on':
-                commands.append(ActuatorCommand(
+                emit(ActuatorCommand(
                     actuator_id='gas_alarm',
                     actuator_type='alarm',
                     state='off',
-                    reason=f'Gas level normalized: {gas_level} ppm at {location}'
+                    reason=LazyReason('Gas level normalized: {} ppm at {}', gas_level, location)
                 ))
             
             if current_exhaust_state != 'off':
-                commands.append(ActuatorCommand(
+                emit(ActuatorCommand(
                     actuator_id='kitchen_exhaust',
                     actuator_type='fan',
                     state='off',
-                    reason=f'Gas level normalized: {gas_level} ppm at {location}'
+                    reason=LazyReason('Gas level normalized: {} ppm at {}', gas_level, location)
                 ))
-        
-        return commands
     
-    def _process_smoke(self, smoke: int, location: str) -> List[ActuatorCommand]:
+    def _process_smoke(self, smoke: int, location: str, reading: Dict, emit: Emit) -> None:
         """Process smoke sensor readings"""
-        commands = []
-        
-        if smoke == 1 and self._can_send_alert('fire_alarm'):
+        if smoke == 1 and self._can_send_alert('fire_alarm', self._clock):
             # Smoke detected - trigger alarm
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='fire_alarm',
                 actuator_type='alarm',
                 state='on',
-                reason=f'Smoke detected at {location}'
+                reason=LazyReason('Smoke detected at {}', location)
             ))
             # Turn off potentially dangerous appliances
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='hvac_system',
                 actuator_type='climate_control',
                 state='off',
-                reason='Fire safety protocol'
+                reason=REASON_FIRE_SAFETY
             ))
-        
-        return commands
     
-    def _process_distance(self, distance: float, location: str, reading: Dict) -> List[ActuatorCommand]:
+    def _process_distance(self, distance: float, location: str, reading: Dict, emit: Emit) -> None:
         """Process distance sensor readings (dust cleaner)"""
-        commands = []
-        rules = self.rules['distance']
+        critical, obstacle = self._thr['distance']
         
-        if distance < rules['critical_threshold']:
+        if distance < critical:
             # Very close obstacle - stop immediately
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='dust_cleaner_motor',
                 actuator_type='motor',
                 state='paused',
-                reason=f'Critical obstacle at {distance}cm'
+                reason=LazyReason('Critical obstacle at {}cm', distance)
             ))
         
-        elif distance < rules['obstacle_threshold']:
+        elif distance < obstacle:
             # Obstacle detected - pause or navigate
             object_name = reading.get('object_name', 'unknown')
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='dust_cleaner_motor',
                 actuator_type='motor',
                 state='paused',
-                reason=f'Obstacle detected: {object_name} at {distance}cm'
+                reason=LazyReason('Obstacle detected: {} at {}cm', object_name, distance)
             ))
-        
-        return commands
     
-    def _process_water_leak(self, leak: int, location: str) -> List[ActuatorCommand]:
+    def _process_water_leak(self, leak: int, location: str, reading: Dict, emit: Emit) -> None:
         """Process water leak sensor readings"""
-        commands = []
-        
         if leak == 1:
             # Water leak detected - shut off water (no cooldown for safety)
             current_state = self.actuator_states.get('water_shutoff', 'on')
             if current_state != 'off':
-                commands.append(ActuatorCommand(
+                emit(ActuatorCommand(
                     actuator_id='water_shutoff',
                     actuator_type='valve',
                     state='off',
-                    reason=f'Water leak detected at {location}'
+                    reason=LazyReason('Water leak detected at {}', location)
                 ))
         elif leak == 0:
             # No leak - turn water back on if it was off
             current_state = self.actuator_states.get('water_shutoff', 'on')
             if current_state == 'off':
-                commands.append(ActuatorCommand(
+                emit(ActuatorCommand(
                     actuator_id='water_shutoff',
                     actuator_type='valve',
                     state='on',
-                    reason=f'Water leak cleared at {location}'
+                    reason=LazyReason('Water leak cleared at {}', location)
                 ))
-        
-        return commands
     
-    def _process_door_sensor(self, door_state: int, location: str) -> List[ActuatorCommand]:
+    def _process_door_sensor(self, door_state: int, location: str, reading: Dict, emit: Emit) -> None:
         """Process door/window sensor readings"""
-        commands = []
-        
         if door_state == 0 and location == 'entrance':
             # Door open at entrance - turn on entrance light
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='entrance_lights',
                 actuator_type='light',
                 state='on',
-                reason='Entrance door opened'
+                reason=REASON_ENTRANCE_DOOR_OPENED
             ))
         
-        return commands
 
-    def _process_sound(self, sound: float, location: str) -> List[ActuatorCommand]:
-        commands = []
-        rules = self.rules.get('sound', {})
-        if not rules:
-            return commands
-        if sound >= rules['critical_threshold']:
-            commands.append(ActuatorCommand(
+    def _process_sound(self, sound: float, location: str, reading: Dict, emit: Emit) -> None:
+        warning, critical = self._thr['sound']
+        if sound >= critical:
+            emit(ActuatorCommand(
                 actuator_id='siren',
                 actuator_type='alarm',
                 state='on',
-                reason=f'Critical noise {sound} dB at {location}'
+                reason=LazyReason('Critical noise {} dB at {}', sound, location)
             ))
-        elif sound >= rules['warning_threshold']:
+        elif sound >= warning:
             # optional logging only
             pass
-        return commands
 
-    def _process_vibration(self, vib: float, location: str) -> List[ActuatorCommand]:
-        commands = []
-        rules = self.rules.get('vibration', {})
-        if not rules:
-            return commands
-        if vib >= rules['critical_threshold']:
-            commands.append(ActuatorCommand(
+    def _process_vibration(self, vib: float, location: str, reading: Dict, emit: Emit) -> None:
+        critical = self._thr['vibration'][0]
+        if vib >= critical:
+            emit(ActuatorCommand(
                 actuator_id='siren',
                 actuator_type='alarm',
                 state='on',
-                reason=f'Critical vibration {vib}g at {location}'
+                reason=LazyReason('Critical vibration {}g at {}', vib, location)
             ))
-        return commands
 
-    def _process_energy(self, watts: float, location: str) -> List[ActuatorCommand]:
-        commands = []
-        rules = self.rules.get('energy', {})
-        if not rules:
-            return commands
-        if watts >= rules['critical_threshold']:
-            commands.append(ActuatorCommand(
+    def _process_energy(self, watts: float, location: str, reading: Dict, emit: Emit) -> None:
+        high, critical = self._thr['energy']
+        if watts >= critical:
+            emit(ActuatorCommand(
                 actuator_id='smart_plug',
                 actuator_type='switch',
                 state='off',
-                reason=f'Critical energy draw {watts}W at {location}'
+                reason=LazyReason('Critical energy draw {}W at {}', watts, location)
             ))
-        elif watts >= rules['high_threshold']:
-            commands.append(ActuatorCommand(
+        elif watts >= high:
+            emit(ActuatorCommand(
                 actuator_id='smart_plug',
                 actuator_type='switch',
                 state='off',
-                reason=f'High energy draw {watts}W at {location}'
+                reason=LazyReason('High energy draw {}W at {}', watts, location)
             ))
-        return commands
 
-    def _process_uv(self, uv: float, location: str) -> List[ActuatorCommand]:
-        commands = []
-        rules = self.rules.get('uv', {})
-        if not rules:
-            return commands
-        if uv >= rules['high_threshold']:
-            commands.append(ActuatorCommand(
+    def _process_uv(self, uv: float, location: str, reading: Dict, emit: Emit) -> None:
+        high = self._thr['uv'][0]
+        if uv >= high:
+            emit(ActuatorCommand(
                 actuator_id='rain_shutter',
                 actuator_type='shutter',
                 state='closed',
-                reason=f'High UV index {uv} at {location}'
+                reason=LazyReason('High UV index {} at {}', uv, location)
             ))
-        return commands
 
-    def _process_rain(self, rain: int, location: str) -> List[ActuatorCommand]:
-        commands = []
+    def _process_rain(self, rain: int, location: str, reading: Dict, emit: Emit) -> None:
         if rain == 1:
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='rain_shutter',
                 actuator_type='shutter',
                 state='closed',
-                reason=f'Rain detected at {location}'
+                reason=LazyReason('Rain detected at {}', location)
             ))
-        return commands
 
-    def _process_glass_break(self, detected: int, location: str) -> List[ActuatorCommand]:
-        commands = []
-        if detected == 1 and self._can_send_alert('glass_break'):
-            commands.append(ActuatorCommand(
+    def _process_glass_break(self, detected: int, location: str, reading: Dict, emit: Emit) -> None:
+        if detected == 1 and self._can_send_alert('glass_break', self._clock):
+            emit(ActuatorCommand(
                 actuator_id='siren',
                 actuator_type='alarm',
                 state='on',
-                reason=f'Glass break detected at {location}'
+                reason=LazyReason('Glass break detected at {}', location)
             ))
-        return commands
 
-    def _process_pressure_mat(self, present: int, location: str) -> List[ActuatorCommand]:
-        commands = []
+    def _process_pressure_mat(self, present: int, location: str, reading: Dict, emit: Emit) -> None:
         if present == 1 and location == 'entrance':
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='entrance_lights',
                 actuator_type='light',
                 state='on',
-                reason='Presence detected on pressure mat'
+                reason=REASON_PRESSURE_MAT_PRESENCE
             ))
-        return commands
     
-    def _get_all_recent_temperatures(self) -> List[Dict[str, Any]]:
+    def _get_all_recent_temperatures(self, now: float) -> List[Dict[str, Any]]:
         """Get all recent temperature readings from all locations"""
-        temps = []
-        cutoff_time = datetime.utcnow() - timedelta(minutes=5)  # Last 5 minutes
-        
-        for key, history in self.sensor_history.items():
-            if '_temperature' in key and history:
-                # Get the most recent reading
-                recent = history[-1]
-                if recent['timestamp'] >= cutoff_time:
-                    location = key.split('_temperature')[0]
-                    temps.append({
-                        'location': location,
-                        'value': recent['value'],
-                        'timestamp': recent['timestamp']
-                    })
-        
-        return temps
+        cutoff_time = now - 300  # Last 5 minutes
+        
+        # Entries are in update order, so stale ones sit at the front
+        latest = self._latest_temperature
+        while latest and next(iter(latest.values()))[1] < cutoff_time:
+            latest.popitem(last=False)
+        
+        return [
+            {'location': location, 'value': value, 'timestamp': timestamp}
+            for location, (value, timestamp) in latest.items()
+        ]
     
     def set_manual_override(self, actuator_id: str):
         """Mark an actuator as manually controlled"""
-        self.manual_override[actuator_id] = datetime.utcnow()
-        logger.info(f"Manual override enabled for {actuator_id}")
+        with self._lock:
+            self.manual_override[actuator_id] = time.monotonic()
+            logger.info(f"Manual override enabled for {actuator_id}")
     
     def clear_manual_override(self, actuator_id: str):
         """Clear manual override for an actuator"""
-        if actuator_id in self.manual_override:
-            del self.manual_override[actuator_id]
-            logger.info(f"Manual override cleared for {actuator_id}")
+        with self._lock:
+            if actuator_id in self.manual_override:
+                del self.manual_override[actuator_id]
+                logger.info(f"Manual override cleared for {actuator_id}")
     
     def is_manually_overridden(self, actuator_id: str) -> bool:
         """Check if actuator is currently under manual control"""
-        if actuator_id not in self.manual_override:
-            return False
-        
-        # Check if override has expired
-        time_since_override = (datetime.utcnow() - self.manual_override[actuator_id]).total_seconds()
-        if time_since_override > self.manual_override_timeout:
-            # Override expired, clear it
-            del self.manual_override[actuator_id]
-            logger.info(f"Manual override expired for {actuator_id}")
-            return False
-        
-        return True
+        with self._lock:
+            if actuator_id not in self.manual_override:
+                return False
+            
+            # Check if override has expired
+            time_since_override = time.monotonic() - self.manual_override[actuator_id]
+            if time_since_override > self.manual_override_timeout:
+                # Override expired, clear it
+                del self.manual_override[actuator_id]
+                logger.info(f"Manual override expired for {actuator_id}")
+                return False
+            
+            return True
     
-    def _process_aggregated_temperature(self, all_temps: List[Dict[str, Any]]) -> List[ActuatorCommand]:
+    def _process_aggregated_temperature(self, all_temps: List[Dict[str, Any]], emit: Emit) -> None:
         """
         Process all temperature readings together to make a single HVAC decision
         Uses weighted average based on location importance
         """
-        commands = []
-        
         if not all_temps:
-            return commands
+            return
         
         # Check if HVAC is manually controlled
         if self.is_manually_overridden('hvac_system'):
             logger.debug("HVAC system is manually controlled, skipping automated control")
-            return commands
+            return
         
-        rules = self.rules['temperature']
+        low, high, critical = self._thr['temperature']
         current_state = self.actuator_states.get('hvac_system', 'off')
         HYSTERESIS = 2.0
         
-        # Location weights (living areas more important than utility)
-        LOCATION_WEIGHTS = {
-            'living_room': 1.5,
-            'bedroom': 1.5,
-            'kitchen': 1.0,
-            'roof': 0.5,
-            'basement': 0.3
-        }
-        
         # Calculate weighted average temperature
-        total_weight = 0
-        weighted_sum = 0
-        max_temp = -999
-        min_temp = 999
-        
-        for temp_data in all_temps:
-            location = temp_data['location']
-            value = temp_data['value']
-            weight = LOCATION_WEIGHTS.get(location, 1.0)
-            
-            weighted_sum += value * weight
-            total_weight += weight
-            max_temp = max(max_temp, value)
-            min_temp = min(min_temp, value)
+        weight_of = LOCATION_WEIGHTS.get
+        count = len(all_temps)
+        if count >= VECTORIZE_MIN_TEMPERATURES:
+            values = np.fromiter((t['value'] for t in all_temps), dtype=float, count=count)
+            weights = np.fromiter((weight_of(t['location'], 1.0) for t in all_temps), dtype=float, count=count)
+            weighted_sum = float(values @ weights)
+            total_weight = float(weights.sum())
+            max_temp = float(values.max())
+            min_temp = float(values.min())
+        else:
+            total_weight = 0
+            weighted_sum = 0
+            max_temp = -999
+            min_temp = 999
+            for temp_data in all_temps:
+                value = temp_data['value']
+                weight = weight_of(temp_data['location'], 1.0)
+                
+                weighted_sum += value * weight
+                total_weight += weight
+                if value > max_temp:
+                    max_temp = value
+                if value < min_temp:
+                    min_temp = value
         
         avg_temp = weighted_sum / total_weight if total_weight > 0 else 0
         
         logger.info(f"Temperature aggregation: avg={avg_temp:.1f}°C, max={max_temp:.1f}°C, min={min_temp:.1f}°C, locations={len(all_temps)}")
         
         # Critical high temperature (use max temp for safety)
-        if max_temp >= rules['critical_high']:
-            commands.append(ActuatorCommand(
+        if max_temp >= critical:
+            emit(ActuatorCommand(
                 actuator_id='hvac_system',
                 actuator_type='climate_control',
                 state='cooling',
-                reason=f'Critical temperature detected: max={max_temp:.1f}°C across {len(all_temps)} locations'
+                reason=LazyReason('Critical temperature detected: max={:.1f}°C across {} locations', max_temp, len(all_temps))
             ))
-            commands.append(ActuatorCommand(
+            emit(ActuatorCommand(
                 actuator_id='fire_alarm',
                 actuator_type='alarm',
                 state='on',
-                reason=f'Temperature critically high: {max_temp:.1f}°C'
+                reason=LazyReason('Temperature critically high: {:.1f}°C', max_temp)
             ))
         
         # High temperature - turn on cooling (use weighted average)
-        elif avg_temp > rules['high_threshold']:
+        elif avg_temp > high:
             if current_state != 'cooling':
-                commands.append(ActuatorCommand(
+                emit(ActuatorCommand(
                     actuator_id='hvac_system',
                     actuator_type='climate_control',
                     state='cooling',
-                    reason=f'High average temperature: {avg_temp:.1f}°C across {len(all_temps)} locations'
+                    reason=LazyReason('High average temperature: {:.1f}°C across {} locations', avg_temp, len(all_temps))
                 ))
         
         # Temperature dropped - turn off cooling (use weighted average with hysteresis)
-        elif avg_temp <= (rules['high_threshold'] - HYSTERESIS) and current_state == 'cooling':
-            commands.append(ActuatorCommand(
+        elif avg_temp <= (high - HYSTERESIS) and current_state == 'cooling':
+            emit(ActuatorCommand(
                 actuator_id='hvac_system',
                 actuator_type='climate_control',
                 state='off',
-                reason=f'Temperature normalized: avg={avg_temp:.1f}°C across {len(all_temps)} locations'
+                reason=LazyReason('Temperature normalized: avg={:.1f}°C across {} locations', avg_temp, len(all_temps))
             ))
         
         # Low temperature - turn on heating (use min temp for comfort)
-        elif min_temp < rules['low_threshold']:
+        elif min_temp < low:
             if current_state != 'heating':
-                commands.append(ActuatorCommand(
+                emit(ActuatorCommand(
                     actuator_id='hvac_system',
                     actuator_type='climate_control',
                     state='heating',
-                    reason=f'Low temperature detected: min={min_temp:.1f}°C across {len(all_temps)} locations'
+                    reason=LazyReason('Low temperature detected: min={:.1f}°C across {} locations', min_temp, len(all_temps))
                 ))
         
         # Temperature rose - turn off heating (use weighted average with hysteresis)
-        elif avg_temp >= (rules['low_threshold'] + HYSTERESIS) and current_state == 'heating':
-            commands.append(ActuatorCommand(
+        elif avg_temp >= (low + HYSTERESIS) and current_state == 'heating':
+            emit(ActuatorCommand(
                 actuator_id='hvac_system',
                 actuator_type='climate_control',
                 state='off',
-                reason=f'Temperature normalized: avg={avg_temp:.1f}°C across {len(all_temps)} locations'
+                reason=LazyReason('Temperature normalized: avg={:.1f}°C across {} locations', avg_temp, len(all_temps))
             ))
-        
-        return commands
     
     def _cross_sensor_decisions(
         self, 
         device_id: str, 
         location: str, 
-        readings: List[Dict]
-    ) -> List[ActuatorCommand]:
+        sensor_types: Sequence[str],
+        values: Sequence[Any],
+        emit: Emit
+    ) -> None:
         """Make decisions based on multiple sensor inputs"""
-        commands = []
-        
-        # Extract sensor values
-        sensor_values = {r['sensor_type']: r['value'] for r in readings}
-        
-        # Kitchen safety: High temp + gas detected
-        if location == 'kitchen':
-            temp = sensor_values.get('temperature')
-            gas = sensor_values.get('gas')
-            
-            if temp and gas and temp > 35 and gas > 500:
-                if self._can_send_alert('kitchen_emergency'):
-                    commands.append(ActuatorCommand(
-                        actuator_id='kitchen_exhaust',
-                        actuator_type='fan',
-                        state='high',
-                        reason=f'Kitchen emergency: temp={temp}°C, gas={gas}ppm'
-                    ))
-        
-        # Entrance security: Motion + door open + no RFID
-        if location == 'entrance':
-            motion = sensor_values.get('motion')
-            door = sensor_values.get('door_sensor')
-            rfid = sensor_values.get('rfid')
-            
-            if motion == 1 and door == 0 and rfid == 'None':
-                # Potential unauthorized entry
-                commands.append(ActuatorCommand(
-                    actuator_id='entrance_lights',
-                    actuator_type='light',
-                    state='on',
-                    value=100,
-                    reason='Potential unauthorized entry detected'
+        # Only some locations have cross-sensor rules
+        handler = self._cross_sensor_handlers.get(location)
+        if handler is not None:
+            # Last reading of a type wins, as when the readings are replayed in order
+            handler(dict(zip(sensor_types, values)), emit)
+    
+    def _kitchen_cross(self, sensor_values: Dict[str, Any], emit: Emit) -> None:
+        """Kitchen safety: High temp + gas detected"""
+        temp = sensor_values.get('temperature')
+        gas = sensor_values.get('gas')
+        
+        if temp and gas and temp > 35 and gas > 500:
+            if self._can_send_alert('kitchen_emergency', self._clock):
+                emit(ActuatorCommand(
+                    actuator_id='kitchen_exhaust',
+                    actuator_type='fan',
+                    state='high',
+                    reason=LazyReason('Kitchen emergency: temp={}°C, gas={}ppm', temp, gas)
                 ))
-        
-        return commands
     
-    def _update_history(self, device_id: str, readings: List[Dict]):
-        """Update sensor history for trend analysis"""
-        for reading in readings:
-            key = f"{device_id}_{reading['sensor_type']}"
-            self.sensor_history[key].append({
-                'value': reading['value'],
-                'timestamp': datetime.utcnow()
-            })
-            # Keep only recent history
-            if len(self.sensor_history[key]) > 100:
-                self.sensor_history[key] = self.sensor_history[key][-100:]
+    def _entrance_cross(self, sensor_values: Dict[str, Any], emit: Emit) -> None:
+        """Entrance security: Motion + door open + no RFID"""
+        motion = sensor_values.get('motion')
+        door = sensor_values.get('door_sensor')
+        rfid = sensor_values.get('rfid')
+        
+        if motion == 1 and door == 0 and rfid == 'None':
+            # Potential unauthorized entry
+            emit(ActuatorCommand(
+                actuator_id='entrance_lights',
+                actuator_type='light',
+                state='on',
+                value=100,
+                reason=REASON_UNAUTHORIZED_ENTRY
+            ))
     
-    def _has_recent_motion(self, location: str, timeout_seconds: int = 300) -> bool:
+    def _update_history(self, device_id: str, sensor_types: Sequence[str], values: Sequence[Any], now: float):
+        """Queue readings for the sensor history (applied lazily by _flush_history)"""
+        pending = self._pending_history
+        pairs = list(zip(sensor_types, values))
+        pending.append((device_id, pairs, now))
+        
+        # Keep the latest temperature per device current for the HVAC aggregation
+        latest = self._latest_temperature
+        for sensor_type, value in pairs:
+            if sensor_type == 'temperature':
+                latest[device_id] = (value, now)
+                latest.move_to_end(device_id)
+        
+        if len(pending) >= HISTORY_FLUSH_THRESHOLD:
+            self._flush_history()
+        if now - self._last_history_prune >= HISTORY_PRUNE_INTERVAL:
+            self._last_history_prune = now
+            self._prune_history(now)
+    
+    def _flush_history(self):
+        """Apply queued readings to sensor_history; called before any history read"""
+        pending = self._pending_history
+        sensor_history = self.sensor_history
+        while pending:
+            device_id, values, clock = pending.popleft()
+            for sensor_type, value in values:
+                # Bounded deque drops the oldest entry once full
+                sensor_history[(device_id, sensor_type)].append((value, clock))
+    
+    def _prune_history(self, now: float):
+        """Forget history of sensors whose newest reading is older than HISTORY_IDLE_SECONDS"""
+        self._flush_history()
+        cutoff = now - Config.HISTORY_IDLE_SECONDS
+        sensor_history = self.sensor_history
+        idle = [key for key, history in sensor_history.items() if not history or history[-1][1] < cutoff]
+        for key in idle:
+            del sensor_history[key]
+        if idle:
+            logger.debug(f"Pruned history for {len(idle)} idle sensors")
+    
+    def _has_recent_motion(self, location: str, now: float, timeout_seconds: int = 300) -> bool:
         """Check if there was recent motion in location"""
         if location not in self.last_motion_time:
             return False
         
-        time_since_motion = (datetime.utcnow() - self.last_motion_time[location]).total_seconds()
-        return time_since_motion < timeout_seconds
+        return (now - self.last_motion_time[location]) < timeout_seconds
     
-    def _check_motion_timeout(self, location: str, commands: List[ActuatorCommand]):
+    def _check_motion_timeout(self, location: str, now: float, emit: Emit):
         """Check if motion timeout expired and turn off lights"""
-        if not self._has_recent_motion(location, timeout_seconds=300):
-            light_id = f'{location}_lights'
-            if light_id in Config.ACTUATORS:
+        if not self._has_recent_motion(location, now, timeout_seconds=300):
+            light_id = self._light_id_by_location.get(location)
+            if light_id is not None:
                 current_state = self.actuator_states.get(light_id, 'off')
                 if current_state == 'on':
-                    commands.append(ActuatorCommand(
+                    emit(ActuatorCommand(
                         actuator_id=light_id,
                         actuator_type='light',
                         state='off',
-                        reason=f'No motion timeout at {location}'
+                        reason=LazyReason('No motion timeout at {}', location)
                     ))
     
     def _get_recent_sensor_value(
@@ -768,24 +784,21 @@ class DecisionEngine:
         sensor_type: str
     ) -> Optional[float]:
         """Get most recent sensor value for a location"""
-        key = f"{location}_{sensor_type}"
-        if key in self.sensor_history and self.sensor_history[key]:
-            return self.sensor_history[key][-1]['value']
+        self._flush_history()
+        history = self.sensor_history.get((location, sensor_type))
+        if history:
+            return history[-1][0]
         return None
     
-    def _can_send_alert(self, alert_id: str, cooldown_seconds: int = 60) -> bool:
+    def _can_send_alert(self, alert_id: str, now: float, cooldown_seconds: int = 60) -> bool:
         """Check if we can send an alert (prevent spam)"""
-        if alert_id not in self.alert_cooldown:
-            self.alert_cooldown[alert_id] = datetime.utcnow()
+        # Never-sent alerts default to -inf (monotonic time may be small after boot)
+        if now - self.alert_cooldown.get(alert_id, float('-inf')) > cooldown_seconds:
+            self.alert_cooldown[alert_id] = now
             return True
-        
-        time_since_last = (datetime.utcnow() - self.alert_cooldown[alert_id]).total_seconds()
-        if time_since_last > cooldown_seconds:
-            self.alert_cooldown[alert_id] = datetime.utcnow()
-            return True
-        
         return False
     
     def update_actuator_state(self, actuator_id: str, state: str):
         """Update cached actuator state"""
-        self.actuator_states[actuator_id] = state
+        with self._lock:
+            self.actuator_states[actuator_id] = state
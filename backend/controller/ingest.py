@@ -0,0 +1,154 @@
+"""
+Sensor payload ingestion helpers for the IoT controller
+Parses XML payloads and recognizes retransmitted payloads so they are answered without reprocessing
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+import time
+
+import orjson
+from lxml import etree
+
+# XML ingestion: hardened parser and XPath expressions compiled once at import
+XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=False)
+_DEVICE_ID_XPATH = etree.XPath('string(//device_id)', smart_strings=False)
+_LOCATION_XPATH = etree.XPath('string(//location)', smart_strings=False)
+_SENSORS_XPATH = etree.XPath('//sensor')
+
+# Fast path for the flat documents the sensor service sends: one regex pass over the raw
+# bytes; anything else (entities, CDATA, DOCTYPE, other encodings, extra markup) goes to lxml
+_XML_DECLARED_ENCODING_RE = re.compile(rb'^\s*<\?xml[^>]*?encoding=["\']([\w.:-]+)["\']')
+_XML_DEVICE_ID_TAG_RE = re.compile(rb'<device_id[\s/>]')
+_XML_DEVICE_ID_RE = re.compile(rb'<device_id>([^<]*)</device_id>')
+_XML_LOCATION_TAG_RE = re.compile(rb'<location[\s/>]')
+_XML_LOCATION_RE = re.compile(rb'<location>([^<]*)</location>')
+_XML_SENSOR_TAG_RE = re.compile(rb'<sensor[\s/>]')
+_XML_SENSOR_RE = re.compile(
+    rb'<sensor>\s*'
+    rb'<type>([^<]*)</type>\s*'
+    rb'<value>([^<]*)</value>\s*'
+    rb'(?:<unit>([^<]*)</unit>|<unit\s*/>)\s*'
+    rb'(?:<object_name>[^<]*</object_name>\s*)?'
+    rb'</sensor>'
+)
+
+# Maximum number of remembered payload results
+DUPLICATE_CACHE_SIZE = 4096
+
+
+def _xml_reading(sensor_type: str, value_text: Optional[str], unit: str) -> Dict[str, Any]:
+    """Build a reading from XML text fields (numeric values become floats)"""
+    if value_text is not None:
+        try:
+            value = float(value_text)
+        except ValueError:
+            value = value_text
+    else:
+        value = None
+    return {
+        'sensor_type': sensor_type,
+        'value': value,
+        'unit': unit
+    }
+
+
+def _first_text(tag_re: "re.Pattern[bytes]", element_re: "re.Pattern[bytes]", xml_data: bytes) -> Optional[bytes]:
+    """Text of the first element matched by tag_re if it holds plain text only, else None"""
+    first = tag_re.search(xml_data)
+    if first is None:
+        return None
+    element = element_re.match(xml_data, first.start())
+    return element.group(1) if element else None
+
+
+def _parse_sensor_xml_fast(xml_data: bytes) -> Optional[Tuple[str, str, List[Dict[str, Any]]]]:
+    """Regex extraction of (device_id, location, readings); None if the document needs lxml"""
+    if b'&' in xml_data or b'<!' in xml_data:
+        return None
+    declared = _XML_DECLARED_ENCODING_RE.match(xml_data)
+    if declared and declared.group(1).lower() not in (b'utf-8', b'utf8', b'us-ascii', b'ascii'):
+        return None
+    device_id = _first_text(_XML_DEVICE_ID_TAG_RE, _XML_DEVICE_ID_RE, xml_data)
+    location = _first_text(_XML_LOCATION_TAG_RE, _XML_LOCATION_RE, xml_data)
+    sensor_matches = _XML_SENSOR_RE.findall(xml_data)
+    # Every <sensor> must have been matched, or the document has a shape we don't know
+    if device_id is None or location is None or len(sensor_matches) != len(_XML_SENSOR_TAG_RE.findall(xml_data)):
+        return None
+    try:
+        readings = [
+            _xml_reading(sensor_type.decode(), value_text.decode(), unit.decode())
+            for sensor_type, value_text, unit in sensor_matches
+        ]
+        return device_id.decode() or 'unknown', location.decode() or 'unknown', readings
+    except UnicodeDecodeError:
+        return None
+
+
+def _parse_sensor_xml_lxml(xml_data: bytes) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """Extract (device_id, location, readings) with the hardened lxml parser"""
+    root = etree.fromstring(xml_data, XML_PARSER)
+    device_id = _DEVICE_ID_XPATH(root) or 'unknown'
+    location = _LOCATION_XPATH(root) or 'unknown'
+    # type/value/unit are direct children of <sensor>
+    readings = [
+        _xml_reading(sensor.findtext('type', ''), sensor.findtext('value'), sensor.findtext('unit', ''))
+        for sensor in _SENSORS_XPATH(root)
+    ]
+    return device_id, location, readings
+
+
+def parse_sensor_xml(xml_data: bytes) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """Extract (device_id, location, readings) from an XML sensor payload"""
+    parsed = _parse_sensor_xml_fast(xml_data)
+    if parsed is not None:
+        return parsed
+    return _parse_sensor_xml_lxml(xml_data)
+
+
+def payload_fingerprint(data: Dict[str, Any]) -> Optional[bytes]:
+    """Digest identifying one transmission of a payload; None if a retransmit can't be told from a new reading"""
+    # The sender's timestamp is what separates a retransmit from a new reading with the same values
+    timestamp = data.get('timestamp')
+    if timestamp is None:
+        return None
+    try:
+        payload = orjson.dumps((data.get('device_id'), data.get('location'), timestamp, data.get('readings', [])))
+    except orjson.JSONEncodeError:
+        return None
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+class RecentResults:
+    """Results of recently processed payloads by fingerprint, kept for `window` seconds"""
+    
+    def __init__(self, window: float, max_size: int = DUPLICATE_CACHE_SIZE, clock: Callable[[], float] = time.monotonic):
+        """Initialize the cache (a window of 0 disables it)"""
+        self.window = window
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()  # fingerprint -> (expires_at, result), oldest first
+        self._lock = threading.Lock()
+    
+    def get(self, fingerprint: bytes) -> Optional[Dict[str, Any]]:
+        """Return the result of a payload seen within the window"""
+        now = self._clock()
+        with self._lock:
+            # Entries share one window, so expired ones are always at the front
+            entries = self._entries
+            while entries and next(iter(entries.values()))[0] <= now:
+                entries.popitem(last=False)
+            entry = entries.get(fingerprint)
+        return entry[1] if entry is not None else None
+    
+    def put(self, fingerprint: bytes, result: Dict[str, Any]):
+        """Remember a payload's result for the window"""
+        expires_at = self._clock() + self.window
+        with self._lock:
+            entries = self._entries
+            entries.pop(fingerprint, None)
+            entries[fingerprint] = (expires_at, result)
+            if len(entries) > self.max_size:
+                entries.popitem(last=False)
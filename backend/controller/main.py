@@ -4,16 +4,22 @@ Handles REST API, WebSocket, and sensor data processing
 """
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from flask_compress import Compress
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO, emit
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import uuid
 import sys
 import os
 import io
 import base64
 import threading
+import queue
+from functools import partial
+from types import MappingProxyType
+import orjson
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
@@ -27,8 +33,9 @@ load_dotenv(env_path)
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from backend.config import Config
-from backend.controller.database import DatabaseManager
+from backend.controller.database import DatabaseManager, CURSOR_BATCH_SIZE
 from backend.controller.decision_engine import DecisionEngine
+from backend.controller.ingest import RecentResults, parse_sensor_xml, payload_fingerprint
 from backend.controller.ml_model import MLModelManager
 from backend.security import (
     SecurityManager, require_api_key, require_device_auth, 
@@ -46,13 +53,93 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fixed XML/SOAP responses (the success body takes the command count via %d)
+XML_RESPONSE_OK = b"""<?xml version="1.0" encoding="UTF-8"?>
+<response>
+    <status>success</status>
+    <message>Data processed successfully</message>
+    <actuator_commands>%d</actuator_commands>
+</response>"""
+XML_RESPONSE_QUEUED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<response>
+    <status>queued</status>
+    <message>Data accepted for processing</message>
+</response>"""
+XML_RESPONSE_QUEUE_FULL = b"""<?xml version="1.0" encoding="UTF-8"?>
+<response>
+    <status>error</status>
+    <message>Ingest queue full</message>
+</response>"""
+XML_CONTENT_TYPE = {'Content-Type': 'application/xml'}
+
+class ConfigJSONProvider(DefaultJSONProvider):
+    """orjson-backed JSON provider that also serializes the immutable containers used by Config"""
+    
+    # Sorted keys and datetimes routed through default() keep Flask's output format
+    ORJSON_OPTIONS = (
+        orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY
+    )
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, (set, frozenset)):
+            return sorted(o)
+        if isinstance(o, MappingProxyType):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Formatting options (indent, ...) are only supported by the stdlib encoder
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.ORJSON_OPTIONS).decode()
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.ORJSON_OPTIONS),
+            mimetype=self.mimetype
+        )
+
+
+class OrjsonSocketIOJSON:
+    """json module for Socket.IO packets: encodes with orjson like ConfigJSONProvider"""
+    
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        # Socket.IO only passes separators=(',', ':'), which is orjson's fixed compact output
+        return orjson.dumps(
+            obj, default=ConfigJSONProvider.default, option=ConfigJSONProvider.ORJSON_OPTIONS
+        ).decode()
+    
+    @staticmethod
+    def loads(s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ConfigJSONProvider(app)
 app.config['SECRET_KEY'] = Config.JWT_SECRET_KEY
-CORS(app, resources={r"/*": {"origins": "*"}})  # Allow all origins for development
+# Browser origins from CORS_ORIGINS ('*' allows any origin, e.g. for development)
+cors_origins = '*' if '*' in Config.CORS_ORIGINS else sorted(Config.CORS_ORIGINS)
+CORS(app, resources={r"/*": {"origins": cors_origins}})
+# Brotli/gzip for JSON responses large enough to benefit (status, decisions, history)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+Compress(app)
 
 # Initialize SocketIO with authentication
-socketio = SocketIO(app, cors_allowed_origins="*")  # Allow all origins for development
+socketio = SocketIO(
+    app,
+    cors_allowed_origins=cors_origins,
+    json=OrjsonSocketIOJSON,
+    async_mode=Config.SOCKETIO_ASYNC_MODE
+)
 
 # Initialize security components
 security_manager = SecurityManager(Config)
@@ -65,13 +152,31 @@ def after_request(response):
     return add_security_headers(response)
 
 # Initialize components
-db = DatabaseManager(Config.MONGODB_URI, Config.MONGODB_DATABASE)
+db = DatabaseManager(
+    Config.MONGODB_URI,
+    Config.MONGODB_DATABASE,
+    max_pool_size=Config.MONGODB_MAX_POOL_SIZE,
+    min_pool_size=Config.MONGODB_MIN_POOL_SIZE,
+    compressors=Config.MONGODB_COMPRESSORS,
+    socket_timeout_ms=Config.MONGODB_SOCKET_TIMEOUT_MS,
+    write_ack_not_required=Config.MONGODB_UNACKNOWLEDGED_WRITES
+)
 decision_engine = DecisionEngine()
 ml_manager = MLModelManager(db)
 ml_scheduler: Optional[threading.Timer] = None
+rollup_scheduler: Optional[threading.Timer] = None
 
-# Store current actuator states
+# Payloads accepted by the sensor endpoints but not yet processed (ASYNC_INGEST)
+ingest_queue: "queue.Queue[tuple]" = queue.Queue(maxsize=Config.INGEST_QUEUE_SIZE)
+
+# Results of recently processed payloads, so device/gateway retransmissions are
+# answered without re-running decisions and writes
+recent_results = RecentResults(Config.DUPLICATE_WINDOW_SECONDS)
+
+# Store current actuator states (read-modify-written from HTTP, Socket.IO and ingest threads)
 actuator_states: Dict[str, ActuatorStatus] = {}
+# Guards actuator_states; taken before _actuator_views_lock when both are needed
+_actuator_state_lock = threading.Lock()
 
 # Initialize actuator states
 for actuator_id, config in Config.ACTUATORS.items():
@@ -81,7 +186,62 @@ for actuator_id, config in Config.ACTUATORS.items():
         state='off',
         location=config['location']
     )
-    db.update_actuator_status(actuator_id, actuator_states[actuator_id].to_dict())
+# One bulk upsert; extra processes sharing the database can opt out
+if Config.INIT_ACTUATOR_STATUS:
+    db.update_actuator_statuses(
+        (actuator_id, status.to_dict()) for actuator_id, status in actuator_states.items()
+    )
+
+# Views of actuator_states served to polling dashboards, rebuilt only after a change
+_actuator_views: Dict[str, Any] = {}
+_actuator_views_generation = 0
+_actuator_views_lock = threading.Lock()
+
+# Number of actuators not 'off', kept current by execute_actuator_command (under _actuator_state_lock)
+active_actuator_count = sum(1 for status in actuator_states.values() if status.state != 'off')
+
+
+def _invalidate_actuator_views():
+    """Drop cached actuator views after actuator_states changed"""
+    global _actuator_views_generation
+    with _actuator_views_lock:
+        _actuator_views_generation += 1
+        _actuator_views.clear()
+
+
+def _actuator_view(name: str, build: Callable[[], Any]) -> Any:
+    """Return a cached actuator view, building it if needed (not cached if state changed meanwhile)"""
+    view = _actuator_views.get(name)
+    if view is None:
+        generation = _actuator_views_generation
+        view = build()
+        with _actuator_views_lock:
+            if generation == _actuator_views_generation:
+                _actuator_views[name] = view
+    return view
+
+
+def _actuator_dicts() -> List[Dict[str, Any]]:
+    """Consistent snapshot of every actuator's status"""
+    with _actuator_state_lock:
+        return [status.to_dict() for status in actuator_states.values()]
+
+
+def _build_actuators_json() -> bytes:
+    return orjson.dumps(
+        {'actuators': _actuator_dicts()},
+        default=ConfigJSONProvider.default,
+        option=ConfigJSONProvider.ORJSON_OPTIONS
+    )
+
+
+def _build_actuator_summary() -> Dict[str, Any]:
+    with _actuator_state_lock:
+        return {
+            'total': len(actuator_states),
+            'active': active_actuator_count,
+            'states': {aid: a.state for aid, a in actuator_states.items()}
+        }
 
 
 @app.route('/')
@@ -119,8 +279,15 @@ def receive_sensor_data_json():
         if data.get('encrypted'):
             data = request_encryption.decrypt_sensor_data(data)
         
-        # Process sensor data
-        result = process_sensor_data(data, format='json')
+        # Process sensor data (or hand it to the ingest worker)
+        if Config.ASYNC_INGEST:
+            result = enqueue_sensor_data(data, format='json')
+            if result is None:
+                return jsonify({'error': 'Ingest queue full'}), 503
+            status_code = 202
+        else:
+            result = process_sensor_data(data, format='json')
+            status_code = 200
         
         # Emit real-time update via WebSocket
         socketio.emit('sensor_update', {
@@ -131,7 +298,7 @@ def receive_sensor_data_json():
             'authenticated': True
         })
         
-        return jsonify(result), 200
+        return jsonify(result), status_code
         
     except Exception as e:
         logger.error(f"Error processing JSON sensor data: {e}", exc_info=True)
@@ -150,8 +317,18 @@ def receive_gateway_data():
         
         logger.info(f"Received gateway data from {data.get('device_id')} (gateway processed)")
         
-        # Persist gateway log
-        db.store_gateway_log({
+        # A retransmit was already logged, processed and broadcast: answer it without writes
+        _, cached = _recent_result(data)
+        if cached is not None:
+            logger.debug(f"Duplicate gateway data from {data.get('device_id')}, reusing result")
+            return jsonify({
+                'status': 'success',
+                'readings_processed': len(data.get('readings', [])),
+                'gateway_stats': data.get('gateway_stats', {})
+            })
+        
+        # Persist gateway log (buffered, flushed with the next batched insert)
+        db.store_gateway_logs_batch([{
             'device_id': data.get('device_id'),
             'location': data.get('location'),
             'timestamp': datetime.utcnow(),
@@ -159,10 +336,16 @@ def receive_gateway_data():
             'filtered_count': len(data.get('readings', [])),
             'outliers_detected': data.get('gateway_stats', {}).get('outliers_removed', 0),
             'outlier_details': data.get('gateway_stats', {}).get('outlier_details', [])
-        })
+        }])
         
-        # Process gateway-filtered data
-        result = process_sensor_data(data, format='json')
+        # Process gateway-filtered data (or hand it to the ingest worker)
+        if Config.ASYNC_INGEST:
+            if enqueue_sensor_data(data, format='json') is None:
+                return jsonify({'error': 'Ingest queue full'}), 503
+            status_code = 202
+        else:
+            process_sensor_data(data, format='json')
+            status_code = 200
         
         # Emit real-time update via WebSocket
         socketio.emit('sensor_update', {
@@ -175,10 +358,10 @@ def receive_gateway_data():
         })
         
         return jsonify({
-            'status': 'success',
+            'status': 'queued' if status_code == 202 else 'success',
             'readings_processed': len(data.get('readings', [])),
             'gateway_stats': data.get('gateway_stats', {})
-        })
+        }), status_code
         
     except Exception as e:
         logger.error(f"Error processing gateway data: {e}", exc_info=True)
@@ -218,7 +401,8 @@ def generate_device_token():
 def receive_sensor_data_xml():
     """Receive sensor data in XML/SOAP format"""
     try:
-        xml_data = request.data.decode('utf-8')
+        # Raw bytes: lxml honours the document's own encoding declaration
+        xml_data = request.data
         
         if not xml_data:
             return jsonify({'error': 'No data provided'}), 400
@@ -226,34 +410,7 @@ def receive_sensor_data_xml():
         logger.info("Received XML sensor data")
         
         # Parse XML data
-        import xml.etree.ElementTree as ET
-        root = ET.fromstring(xml_data)
-        
-        # Extract sensor data from XML
-        device_id = root.find('.//device_id').text if root.find('.//device_id') is not None else 'unknown'
-        location = root.find('.//location').text if root.find('.//location') is not None else 'unknown'
-        
-        readings = []
-        for sensor in root.findall('.//sensor'):
-            sensor_type = sensor.find('type').text if sensor.find('type') is not None else ''
-            value_elem = sensor.find('value')
-            unit = sensor.find('unit').text if sensor.find('unit') is not None else ''
-            
-            # Parse value (handle different types)
-            if value_elem is not None:
-                value_text = value_elem.text
-                try:
-                    value = float(value_text)
-                except ValueError:
-                    value = value_text
-            else:
-                value = None
-            
-            readings.append({
-                'sensor_type': sensor_type,
-                'value': value,
-                'unit': unit
-            })
+        device_id, location, readings = parse_sensor_xml(xml_data)
         
         data = {
             'device_id': device_id,
@@ -262,8 +419,12 @@ def receive_sensor_data_xml():
             'format': 'xml'
         }
         
-        # Process sensor data
-        result = process_sensor_data(data, format='xml')
+        # Process sensor data (or hand it to the ingest worker)
+        if Config.ASYNC_INGEST:
+            if enqueue_sensor_data(data, format='xml') is None:
+                return XML_RESPONSE_QUEUE_FULL, 503, XML_CONTENT_TYPE
+        else:
+            result = process_sensor_data(data, format='xml')
         
         # Emit real-time update via WebSocket
         socketio.emit('sensor_update', {
@@ -274,15 +435,11 @@ def receive_sensor_data_xml():
             'format': 'xml'
         })
         
-        # Return XML response
-        response_xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<response>
-    <status>success</status>
-    <message>Data processed successfully</message>
-    <actuator_commands>{len(result.get('commands', []))}</actuator_commands>
-</response>"""
+        if Config.ASYNC_INGEST:
+            return XML_RESPONSE_QUEUED, 202, XML_CONTENT_TYPE
         
-        return response_xml, 200, {'Content-Type': 'application/xml'}
+        # Return XML response
+        return XML_RESPONSE_OK % len(result.get('commands', [])), 200, XML_CONTENT_TYPE
         
     except Exception as e:
         logger.error(f"Error processing XML sensor data: {e}", exc_info=True)
@@ -294,6 +451,16 @@ def receive_sensor_data_xml():
         return error_xml, 500, {'Content-Type': 'application/xml'}
 
 
+def _recent_result(data: Dict[str, Any]) -> Tuple[Optional[bytes], Optional[Dict[str, Any]]]:
+    """(fingerprint, cached result) of a payload; the fingerprint is None if it can't be deduplicated"""
+    if recent_results.window <= 0 or data.get('manual_override'):
+        return None, None
+    fingerprint = payload_fingerprint(data)
+    if fingerprint is None:
+        return None, None
+    return fingerprint, recent_results.get(fingerprint)
+
+
 def process_sensor_data(data: Dict[str, Any], format: str = 'json') -> Dict[str, Any]:
     """Process incoming sensor data and make decisions"""
     
@@ -303,16 +470,24 @@ def process_sensor_data(data: Dict[str, Any], format: str = 'json') -> Dict[str,
     readings_data = data.get('readings', [])
     gateway_processed = data.get('gateway_processed', False)
     
+    # Retransmitted payloads get the original answer without new decisions or writes
+    fingerprint, cached = _recent_result(data)
+    if cached is not None:
+        logger.debug(f"Duplicate sensor data from {device_id} at {location}, reusing result")
+        return cached
+    
+    now = datetime.utcnow()  # one wall-clock snapshot for the whole request
+    
     # Store in database
     sensor_group_data = {
         'device_id': device_id,
         'location': location,
         'readings': readings_data,
-        'timestamp': datetime.utcnow(),
+        'timestamp': now,
         'format': format,
         'gateway_processed': gateway_processed
     }
-    db.store_sensor_group(sensor_group_data)
+    db.store_sensor_readings_batch([sensor_group_data])
     
     # ML-assisted decisions
     ml_commands = ml_manager.predict_commands(device_id, location, readings_data)
@@ -322,29 +497,35 @@ def process_sensor_data(data: Dict[str, Any], format: str = 'json') -> Dict[str,
     
     commands = ml_commands + rule_commands
     
-    # Execute actuator commands
-    executed_commands = []
+    # Execute actuator commands (no-ops and unknown actuators are left out of the report)
+    executed = []
+    status_updates: List[tuple] = []
+    command_docs: List[Dict[str, Any]] = []
     for command in commands:
-        execute_actuator_command(command)
-        executed_commands.append(command.to_dict())
+        if execute_actuator_command(command, status_updates, now, command_docs):
+            executed.append(command)
+    db.update_actuator_statuses(status_updates)
+    if command_docs:
+        db.store_actuator_commands_batch(command_docs)
+    executed_commands = [command.to_dict() for command in executed]
     
-    # Log decision if commands were issued
-    if commands:
+    # Log decision if commands were executed
+    if executed:
         decision_log = DecisionLog(
             decision_id=str(uuid.uuid4()),
             trigger_sensor=device_id,
             trigger_value=str(readings_data),
             condition='ml_and_rules',
-            actions=commands
+            actions=executed
         )
-        db.store_decision_log(decision_log.to_mongo())
+        db.store_decision_logs_batch([decision_log.to_mongo()])
         
         # Emit decision via WebSocket
         socketio.emit('decision_made', decision_log.to_dict())
     
-    logger.info(f"Processed sensor data from {device_id} at {location}, issued {len(commands)} commands")
+    logger.info(f"Processed sensor data from {device_id} at {location}, executed {len(executed)} of {len(commands)} commands")
     
-    return {
+    result = {
         'status': 'success',
         'device_id': device_id,
         'location': location,
@@ -352,11 +533,47 @@ def process_sensor_data(data: Dict[str, Any], format: str = 'json') -> Dict[str,
         'commands': executed_commands,
         'gateway_processed': gateway_processed
     }
+    if fingerprint is not None:
+        recent_results.put(fingerprint, result)
+    return result
+
+
+def enqueue_sensor_data(data: Dict[str, Any], format: str = 'json') -> Optional[Dict[str, Any]]:
+    """Queue sensor data for the ingest worker; returns None when the queue is full"""
+    try:
+        ingest_queue.put_nowait((data, format))
+    except queue.Full:
+        logger.warning(f"Ingest queue full, rejecting data from {data.get('device_id')}")
+        return None
+    return {
+        'status': 'queued',
+        'device_id': data.get('device_id'),
+        'location': data.get('location'),
+        'readings_count': len(data.get('readings', [])),
+        'queue_depth': ingest_queue.qsize()
+    }
+
+
+def _ingest_worker():
+    """Drain the ingest queue, processing payloads in arrival order"""
+    while True:
+        data, format = ingest_queue.get()
+        try:
+            process_sensor_data(data, format=format)
+        except Exception as exc:
+            logger.error(f"Error processing queued sensor data: {exc}", exc_info=True)
+        finally:
+            ingest_queue.task_done()
 
 
 def _get_recent_dataframes(hours: int = 24):
     cutoff = datetime.utcnow() - timedelta(hours=hours)
-    readings = list(db.sensor_readings.find({'timestamp': {'$gte': cutoff}}))
+    # Stream sensor groups straight into flattened rows
+    readings = db.raw_sensor_readings.find(
+        {'timestamp': {'$gte': cutoff}},
+        {'_id': 0, 'timestamp': 1, 'device_id': 1, 'location': 1, 'format': 1, 'gateway_processed': 1,
+         'readings.sensor_type': 1, 'readings.value': 1, 'readings.unit': 1}
+    ).batch_size(CURSOR_BATCH_SIZE)
     commands = list(db.actuator_commands.find({'timestamp': {'$gte': cutoff}}))
     gateway_logs = list(db.gateway_logs.find({'timestamp': {'$gte': cutoff}}))
     reading_rows = []
@@ -378,39 +595,64 @@ def _get_recent_dataframes(hours: int = 24):
     df_gateway = pd.DataFrame(gateway_logs)
     return df_readings, df_commands, df_gateway
 
-def execute_actuator_command(command: ActuatorCommand):
-    """Execute an actuator command"""
+def execute_actuator_command(
+    command: ActuatorCommand,
+    status_updates: Optional[List[tuple]] = None,
+    now: Optional[datetime] = None,
+    command_docs: Optional[List[Dict[str, Any]]] = None
+) -> bool:
+    """Execute an actuator command (status/command writes are deferred to the given lists); True if it acted"""
+    global active_actuator_count
     actuator_id = command.actuator_id
     
     # Update actuator state
     if actuator_id in actuator_states:
-        actuator_states[actuator_id].state = command.state
-        actuator_states[actuator_id].value = command.value
-        actuator_states[actuator_id].last_updated = datetime.utcnow()
-        
-        # Update in database
-        db.update_actuator_status(actuator_id, actuator_states[actuator_id].to_dict())
+        # Compare and write in one critical section, so concurrent commands can't both act on a stale state
+        with _actuator_state_lock:
+            actuator_status = actuator_states[actuator_id]
+            
+            # Already in the requested state: skip the writes and the WebSocket frame
+            if actuator_status.state == command.state and actuator_status.value == command.value:
+                logger.debug(f"Actuator {actuator_id} already {command.state}, nothing to execute")
+                return False
+            
+            # Off <-> active transitions adjust the running active count alongside the state
+            active_actuator_count += (command.state != 'off') - (actuator_status.state != 'off')
+            actuator_status.state = command.state
+            actuator_status.value = command.value
+            actuator_status.last_updated = now or datetime.utcnow()
+            _invalidate_actuator_views()
+            status = actuator_status.to_dict()
+            
+            # Update decision engine's actuator state cache in the same order as actuator_states
+            decision_engine.update_actuator_state(actuator_id, command.state)
         
-        # Store command in database
-        db.store_actuator_command(command.to_mongo())
+        # Update in database (or queue for the caller's bulk write)
+        if status_updates is None:
+            db.update_actuator_status(actuator_id, status)
+        else:
+            status_updates.append((actuator_id, status))
         
-        # Update decision engine's actuator state cache
-        decision_engine.update_actuator_state(actuator_id, command.state)
+        # Store command in database (or queue for the caller's batched insert)
+        if command_docs is None:
+            db.store_actuator_command(command.to_mongo())
+        else:
+            command_docs.append(command.to_mongo())
         
         # Emit actuator update via WebSocket
-        socketio.emit('actuator_update', actuator_states[actuator_id].to_dict())
+        socketio.emit('actuator_update', status)
         
         logger.info(f"Executed command: {actuator_id} -> {command.state} ({command.reason})")
-    else:
-        logger.warning(f"Unknown actuator: {actuator_id}")
+        return True
+    
+    logger.warning(f"Unknown actuator: {actuator_id}")
+    return False
 
 
 @app.route('/api/actuators', methods=['GET'])
 def get_actuators():
     """Get all actuator statuses"""
-    return jsonify({
-        'actuators': [status.to_dict() for status in actuator_states.values()]
-    })
+    return app.response_class(_actuator_view('actuators_json', _build_actuators_json), mimetype='application/json')
 
 
 @app.route('/api/actuators/<actuator_id>', methods=['POST'])
@@ -439,12 +681,14 @@ def control_actuator(actuator_id: str):
         )
         
         execute_actuator_command(command)
+        with _actuator_state_lock:
+            actuator = actuator_states[actuator_id].to_dict()
         
         logger.info(f"Manual control: {actuator_id} set to {state} (override active for 1 hour)")
         
         return jsonify({
             'status': 'success',
-            'actuator': actuator_states[actuator_id].to_dict(),
+            'actuator': actuator,
             'manual_override': True,
             'override_expires_in_seconds': 3600
         })
@@ -461,8 +705,6 @@ def get_system_status():
     try:
         overview = db.get_system_overview()
         
-        active_actuators = sum(1 for a in actuator_states.values() if a.state != 'off')
-        
         return jsonify({
             'status': 'operational',
             'timestamp': datetime.utcnow().isoformat(),
@@ -470,11 +712,7 @@ def get_system_status():
                 'total_readings': overview['total_sensor_readings'],
                 'readings_last_hour': overview['readings_last_hour']
             },
-            'actuators': {
-                'total': len(actuator_states),
-                'active': active_actuators,
-                'states': {aid: a.state for aid, a in actuator_states.items()}
-            },
+            'actuators': _actuator_view('summary', _build_actuator_summary),
             'decisions': {
                 'total': overview['total_decisions'],
                 'decisions_last_hour': overview['decisions_last_hour']
@@ -496,8 +734,10 @@ def get_statistics():
         if not sensor_type:
             return jsonify({'error': 'sensor_type parameter required'}), 400
         
-        stats = db.get_sensor_statistics(sensor_type, location)
-        gateway_stats = db.get_gateway_statistics()
+        stats, gateway_stats = db.gather(
+            partial(db.get_sensor_statistics, sensor_type, location),
+            db.get_gateway_statistics
+        )
         
         return jsonify({
             'sensor_statistics': stats,
@@ -513,10 +753,12 @@ def analytics_summary():
     """Descriptive analytics summary"""
     try:
         hours = int(request.args.get('hours', 24))
-        sensor_summary = db.get_sensor_aggregate_summary(hours)
-        actuator_usage = db.get_actuator_usage(hours)
-        decision_summary = db.get_decision_summary(hours)
-        gateway_stats = db.get_gateway_statistics(hours)
+        sensor_summary, actuator_usage, decision_summary, gateway_stats = db.gather(
+            partial(db.get_sensor_aggregate_summary, hours),
+            partial(db.get_actuator_usage, hours),
+            partial(db.get_decision_summary, hours),
+            partial(db.get_gateway_statistics, hours)
+        )
         model_status = ml_manager.get_status()
         return jsonify({
             'sensor_summary': sensor_summary,
@@ -662,12 +904,6 @@ def get_recent_decisions():
         limit = int(request.args.get('limit', 50))
         decisions = db.get_recent_decisions(limit)
         
-        # Convert ObjectId to string
-        for decision in decisions:
-            decision['_id'] = str(decision['_id'])
-            if 'timestamp' in decision:
-                decision['timestamp'] = decision['timestamp'].isoformat()
-        
         return jsonify({'decisions': decisions})
         
     except Exception as e:
@@ -767,7 +1003,7 @@ def handle_disconnect():
 def handle_status_request():
     """Handle status request via WebSocket"""
     emit('status_update', {
-        'actuators': [status.to_dict() for status in actuator_states.values()],
+        'actuators': _actuator_dicts(),
         'timestamp': datetime.utcnow().isoformat()
     })
 
@@ -785,15 +1021,43 @@ def _schedule_ml(interval_hours: int = 24):
     ml_scheduler.daemon = True
     ml_scheduler.start()
 
+def _schedule_rollups(interval_seconds: int = 60):
+    """Background scheduler that refreshes the per-minute sensor rollups."""
+    global rollup_scheduler
+    try:
+        db.refresh_sensor_rollups()
+    except Exception as exc:
+        logger.error("Sensor rollup refresh failed: %s", exc, exc_info=True)
+    rollup_scheduler = threading.Timer(interval_seconds, _schedule_rollups, args=[interval_seconds])
+    rollup_scheduler.daemon = True
+    rollup_scheduler.start()
+
+def start_background_tasks():
+    """Start the schedulers and ingest worker (shared by main() and the WSGI entry point)"""
+    # Kick off periodic ML lifecycle (daily by default)
+    _schedule_ml(interval_hours=24)
+    _schedule_rollups(interval_seconds=60)
+    
+    if Config.ASYNC_INGEST:
+        threading.Thread(target=_ingest_worker, name='ingest-worker', daemon=True).start()
+        logger.info(f"Async ingest enabled (queue size {Config.INGEST_QUEUE_SIZE})")
+
+def stop_background_tasks():
+    """Cancel the schedulers and close the database connection"""
+    if ml_scheduler:
+        ml_scheduler.cancel()
+    if rollup_scheduler:
+        rollup_scheduler.cancel()
+    db.close()
+
 def main():
-    """Main entry point"""
+    """Main entry point (development server; see wsgi.py for Gunicorn)"""
     logger.info("Starting IoT Smart Home Controller")
     logger.info(f"MongoDB: {Config.MONGODB_DATABASE}")
     logger.info(f"Host: {Config.CONTROLLER_HOST}:{Config.CONTROLLER_PORT}")
     logger.info(f"Using API Key: {Config.API_KEY[:20]}... (length: {len(Config.API_KEY)})")
     
-    # Kick off periodic ML lifecycle (daily by default)
-    _schedule_ml(interval_hours=24)
+    start_background_tasks()
     
     try:
         # Configure SSL if enabled
@@ -821,14 +1085,10 @@ def main():
         )
     except KeyboardInterrupt:
         logger.info("Shutting down controller")
-        if ml_scheduler:
-            ml_scheduler.cancel()
-        db.close()
+        stop_background_tasks()
     except Exception as e:
         logger.error(f"Error running controller: {e}", exc_info=True)
-        if ml_scheduler:
-            ml_scheduler.cancel()
-        db.close()
+        stop_background_tasks()
 
 
 if __name__ == '__main__':
@@ -12,6 +12,9 @@ from backend.models import ActuatorCommand
 
 logger = logging.getLogger(__name__)
 
+# Only the per-reading fields feature extraction looks at
+READINGS_FEATURE_PROJECTION = {"_id": 0, "readings.sensor_type": 1, "readings.value": 1}
+
 
 class MLModelManager:
     """
@@ -102,7 +105,9 @@ class MLModelManager:
         for cmd in cmds:
             ts = cmd.get("timestamp")
             readings_doc = (
-                self.db.sensor_readings.find_one({"timestamp": {"$lte": ts}}, sort=[("timestamp", -1)]) or {}
+                self.db.raw_sensor_readings.find_one(
+                    {"timestamp": {"$lte": ts}}, READINGS_FEATURE_PROJECTION, sort=[("timestamp", -1)]
+                ) or {}
             )
             readings = readings_doc.get("readings", [])
             feats = self._extract_features_from_readings(readings)
@@ -167,7 +172,9 @@ class MLModelManager:
         try:
             cutoff = datetime.utcnow() - timedelta(hours=hours)
             readings_docs = list(
-                self.db.sensor_readings.find({"timestamp": {"$gte": cutoff}}).sort("timestamp", -1).limit(500)
+                self.db.raw_sensor_readings.find({"timestamp": {"$gte": cutoff}}, READINGS_FEATURE_PROJECTION)
+                .sort("timestamp", -1)
+                .limit(500)
             )
             samples: List[List[float]] = []
             for doc in readings_docs:
@@ -0,0 +1,24 @@
+"""
+WSGI entry point for running the controller under Gunicorn with gevent workers
+
+    gunicorn -k geventwebsocket.gunicorn.workers.GeventWebSocketWorker -w 1 --keep-alive 30 -b 0.0.0.0:5000 backend.controller.wsgi:application
+
+Keep a single worker: Socket.IO sessions and the in-memory actuator state
+live in the worker process.
+"""
+from gevent import monkey
+
+# Must run before anything imports socket/threading/ssl
+monkey.patch_all()
+
+import atexit
+import os
+
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'gevent')
+
+from backend.controller.main import app, start_background_tasks, stop_background_tasks
+
+start_background_tasks()
+atexit.register(stop_background_tasks)
+
+application = app
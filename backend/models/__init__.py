@@ -5,6 +5,7 @@ from .sensor_data import (
     SensorReading,
     SensorGroup,
     ActuatorCommand,
+    LazyReason,
     ActuatorStatus,
     DecisionLog,
     SystemStatus,
@@ -16,6 +17,7 @@ __all__ = [
     'SensorReading',
     'SensorGroup',
     'ActuatorCommand',
+    'LazyReason',
     'ActuatorStatus',
     'DecisionLog',
     'SystemStatus',
@@ -2,7 +2,7 @@
 Data models for IoT system
 """
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 
@@ -88,20 +88,38 @@ class SensorGroup:
             'gateway_processed': self.gateway_processed
         }
 
-@dataclass
+class LazyReason:
+    """Command reason formatted with str.format only when first rendered"""
+    __slots__ = ('template', 'args', '_text')
+    
+    def __init__(self, template: str, *args: Any):
+        self.template = template
+        self.args = args
+        self._text = None
+    
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = self.template.format(*self.args)
+        return self._text
+    
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+@dataclass(slots=True)
 class ActuatorCommand:
     """Command to control an actuator"""
     actuator_id: str
     actuator_type: str
     state: str
     value: Optional[Any] = None
-    reason: str = ""
+    reason: Union[str, LazyReason] = ""
     timestamp: datetime = field(default_factory=datetime.utcnow)
     triggered_by: str = "system"
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         data = asdict(self)
+        data['reason'] = str(self.reason)
         data['timestamp'] = self.timestamp.isoformat()
         return data
     
@@ -112,7 +130,7 @@ class ActuatorCommand:
             'actuator_type': self.actuator_type,
             'state': self.state,
             'value': self.value,
-            'reason': self.reason,
+            'reason': str(self.reason),
             'timestamp': self.timestamp,
             'triggered_by': self.triggered_by
         }
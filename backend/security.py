@@ -12,6 +12,8 @@ from functools import wraps
 from flask import request, jsonify, current_app
 import logging
 
+from backend.config import Config
+
 logger = logging.getLogger(__name__)
 
 class SecurityManager:
@@ -192,8 +194,6 @@ def require_gateway_auth(f):
 
 def add_security_headers(response):
     """Add security headers to response"""
-    from backend.config import Config
-    
     for header, value in Config.SECURITY_HEADERS.items():
         response.headers[header] = value
     
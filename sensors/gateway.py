@@ -30,8 +30,12 @@ class SensorGateway:
         """Initialize gateway with security"""
         self.controller_url = controller_url
         self.config = Config.OUTLIER_DETECTION
+        self.ranges = Config.OUTLIER_RANGES
         self.sensor_windows = {}  # Store recent readings for each sensor
-        self.statistics_log = []
+        self.statistics_log = deque()
+        self.max_statistics_logs = 1000
+        self.window_processed = 0  # running totals over statistics_log
+        self.window_outliers = 0
         self.encryption = RequestEncryption(Config.GATEWAY_API_KEY)
         
         logger.info(f"Secure gateway initialized, forwarding to {controller_url}")
@@ -87,13 +91,18 @@ class SensorGateway:
         }
         
         self.statistics_log.append(gateway_log)
-        if len(self.statistics_log) > 1000:
-            self.statistics_log = self.statistics_log[-1000:]
+        self.window_processed += gateway_log['original_count']
+        self.window_outliers += outliers_detected
+        if len(self.statistics_log) > self.max_statistics_logs:
+            evicted = self.statistics_log.popleft()
+            self.window_processed -= evicted['original_count']
+            self.window_outliers -= evicted['outliers_detected']
         
         # Prepare data to forward
         forwarded_data = {
             'device_id': device_id,
             'location': location,
+            'timestamp': sensor_data.get('timestamp'),  # lets the controller recognize retransmits
             'readings': filtered_readings,
             'gateway_processed': True,
             'gateway_stats': {
@@ -123,7 +132,7 @@ class SensorGateway:
                 verify=True  # Verify SSL certificates
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):  # 202: queued by the controller
                 logger.info(f"Data forwarded successfully ({len(filtered_readings)} readings)")
                 return {
                     'status': 'success',
@@ -156,12 +165,12 @@ class SensorGateway:
         """
         
         # Method 1: Range check (hard limits)
-        if sensor_type in self.config['ranges']:
-            range_limits = self.config['ranges'][sensor_type]
-            if value < range_limits['min']:
-                return True, f"Below minimum: {value} < {range_limits['min']}"
-            if value > range_limits['max']:
-                return True, f"Above maximum: {value} > {range_limits['max']}"
+        range_min = self.ranges.get((sensor_type, 'min'))
+        if range_min is not None and value < range_min:
+            return True, f"Below minimum: {value} < {range_min}"
+        range_max = self.ranges.get((sensor_type, 'max'))
+        if range_max is not None and value > range_max:
+            return True, f"Above maximum: {value} > {range_max}"
         
         # Method 2: IQR (Interquartile Range) method
         if self.config['method'] == 'iqr':
@@ -206,12 +215,13 @@ class SensorGateway:
                 'filter_rate': 0
             }
         
-        total_processed = sum(log['original_count'] for log in self.statistics_log)
-        total_outliers = sum(log['outliers_detected'] for log in self.statistics_log)
+        total_processed = self.window_processed
+        total_outliers = self.window_outliers
+        recent_count = min(10, len(self.statistics_log))
         
         return {
             'total_processed': total_processed,
             'total_outliers': total_outliers,
             'filter_rate': (total_outliers / total_processed) if total_processed > 0 else 0,
-            'recent_logs': self.statistics_log[-10:]
+            'recent_logs': [self.statistics_log[i] for i in range(-recent_count, 0)]
         }
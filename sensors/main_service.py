@@ -279,7 +279,7 @@ class SensorService:
                     verify=False  # Disable SSL verification for self-signed certificates
                 )
                 
-                if response.status_code == 200:
+                if response.status_code in (200, 202):  # 202: queued by the controller
                     logger.debug(f"JSON data from {device_id} sent successfully")
                     return {'status': 'success', 'gateway': False}
                 else:
@@ -330,7 +330,7 @@ class SensorService:
                 verify=False  # Disable SSL verification for self-signed certificates
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):  # 202: queued by the controller
                 logger.debug(f"XML data from {device_id} sent successfully")
             else:
                 logger.warning(
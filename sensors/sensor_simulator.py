@@ -242,10 +242,10 @@ class RFIDSensor(BaseSensor):
     
     def __init__(self, location: str):
         super().__init__('rfid', location, 'string')
+        self.tag_values = Config.get_sensor_ranges()['rfid']['values']
     
     def _generate_value(self):
-        ranges = Config.get_sensor_ranges()['rfid']
-        return random.choice(ranges['values'])
+        return random.choice(self.tag_values)
 
 class SignalStrengthSensor(BaseSensor):
     """Signal strength sensor"""
@@ -377,10 +377,10 @@ class ObjectDetectionSensor(BaseSensor):
     
     def __init__(self, location: str):
         super().__init__('object_detection', location, 'string')
+        self.object_types = Config.get_object_types()
     
     def _generate_value(self):
-        objects = Config.get_object_types()
-        return random.choice(objects)
+        return random.choice(self.object_types)
 
 class SensorDevice:
     """Represents a device with multiple sensors"""
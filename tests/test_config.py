@@ -0,0 +1,47 @@
+"""
+Tests for environment-driven configuration
+"""
+import os
+import unittest
+from unittest import mock
+
+from backend import config as config_module
+from backend.config import Config
+from backend.controller import decision_engine
+
+
+class ResetEnvCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        # Restore the settings from the real environment afterwards
+        self.addCleanup(Config.reset_env_cache)
+
+    def test_settings_follow_the_environment_after_reset(self):
+        with mock.patch.dict(os.environ, {'CONTROLLER_PORT': '6123', 'CORS_ORIGINS': ' http://a.test , ,http://b.test'}):
+            Config.reset_env_cache()
+            self.assertEqual(Config.CONTROLLER_PORT, 6123)
+            self.assertEqual(Config.CORS_ORIGINS, frozenset({'http://a.test', 'http://b.test'}))
+
+    def test_importers_see_the_refreshed_instance(self):
+        with mock.patch.dict(os.environ, {'HISTORY_MAXLEN': '7'}):
+            Config.reset_env_cache()
+            self.assertIs(config_module.config, Config)
+            self.assertIs(decision_engine.Config, Config)
+            self.assertEqual(decision_engine.Config.HISTORY_MAXLEN, 7)
+
+    def test_factory_built_fields_are_rebuilt(self):
+        with mock.patch.dict(os.environ, {'KITCHEN_KEY': 'rotated-kitchen-key'}):
+            Config.reset_env_cache()
+            self.assertEqual(Config.DEVICE_KEYS['kitchen'], 'rotated-kitchen-key')
+
+    def test_generated_jwt_secret_survives_reset(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('JWT_SECRET_KEY', None)
+            Config.reset_env_cache()
+            secret = Config.JWT_SECRET_KEY
+            Config.reset_env_cache()
+            self.assertEqual(Config.JWT_SECRET_KEY, secret)
+
+
+if __name__ == '__main__':
+    unittest.main()
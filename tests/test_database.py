@@ -0,0 +1,203 @@
+"""
+Tests for the database manager's write buffering and rollup coverage
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from pymongo import WriteConcern
+from pymongo.errors import OperationFailure
+
+from backend.controller.database import DatabaseManager
+
+
+class RecordingCollection:
+    """Collection stand-in that records insert_many batches"""
+
+    def __init__(self, write_concern):
+        self.write_concern = write_concern
+        self.batches = []
+
+    def insert_many(self, documents, ordered=True, bypass_document_validation=False):
+        self.batches.append(list(documents))
+
+
+def _manager(**kwargs):
+    """DatabaseManager without a server: the client connects lazily and collection setup is skipped"""
+    with mock.patch.object(DatabaseManager, '_ensure_timeseries', return_value=True), \
+            mock.patch.object(DatabaseManager, '_create_indexes'):
+        return DatabaseManager('mongodb://localhost:1/?serverSelectionTimeoutMS=100', 'iot_test', **kwargs)
+
+
+class WriteBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = _manager(batch_size=3, flush_interval=60.0)
+        self.targets = {
+            'sensor_readings': RecordingCollection(WriteConcern(w=1)),
+            'actuator_commands': RecordingCollection(WriteConcern(w=1)),
+            'decision_logs': RecordingCollection(WriteConcern(w=1)),
+            'gateway_logs': RecordingCollection(WriteConcern(w=1))
+        }
+        self.db._buffer_targets = self.targets
+
+    def test_flush_targets_follow_the_write_ack_setting(self):
+        acknowledged = _manager()
+        unacknowledged = _manager(write_ack_not_required=True)
+        for manager in (acknowledged, unacknowledged):
+            self.addCleanup(manager.close)
+        for name in self.targets:
+            self.assertTrue(acknowledged._buffer_targets[name].write_concern.acknowledged)
+            self.assertFalse(unacknowledged._buffer_targets[name].write_concern.acknowledged)
+
+    def test_full_batch_is_written_immediately(self):
+        self.db.store_sensor_readings_batch([{'value': i} for i in range(3)])
+        self.assertEqual([len(batch) for batch in self.targets['sensor_readings'].batches], [3])
+        self.db.close()
+
+    def test_close_flushes_buffered_inserts(self):
+        reading_ids = self.db.store_sensor_readings_batch([{'value': 1.0}, {'value': 2.0}])
+        command_ids = self.db.store_actuator_commands_batch([{'actuator_id': 'hvac_system', 'state': 'off'}])
+        self.assertEqual(self.targets['sensor_readings'].batches, [])
+        self.assertIsNotNone(self.db._flush_timer)
+
+        self.db.close()
+
+        self.assertIsNone(self.db._flush_timer)
+        written = self.targets['sensor_readings'].batches
+        self.assertEqual(len(written), 1)
+        self.assertEqual([str(document['_id']) for document in written[0]], reading_ids)
+        self.assertEqual(
+            [str(document['_id']) for document in self.targets['actuator_commands'].batches[0]],
+            command_ids
+        )
+        self.assertEqual(self.targets['decision_logs'].batches, [])
+        self.assertEqual(self.targets['gateway_logs'].batches, [])
+        self.assertTrue(all(not buffer for buffer in self.db._buffers.values()))
+
+
+
+class SensorRollupTest(unittest.TestCase):
+
+    NOW = datetime(2024, 1, 2, 12, 30, 45)
+
+    def setUp(self):
+        self.db = _manager(cache_ttl=0)
+        self.addCleanup(self.db.close)
+        self.db.sensor_readings = mock.Mock(name='sensor_readings', **{'aggregate.return_value': []})
+        self.db.sensor_readings.name = 'sensor_readings'
+        self.db.sensor_rollups = mock.Mock(name='sensor_rollups', **{'aggregate.return_value': []})
+        self.db.rollup_state = mock.Mock(name='rollup_state')
+        patcher = mock.patch('backend.controller.database.datetime', wraps=datetime)
+        patcher.start().utcnow.return_value = self.NOW
+        self.addCleanup(patcher.stop)
+
+    def _set_coverage(self, covered_from, watermark):
+        self.db.rollup_state.find_one.return_value = {'covered_from': covered_from, 'watermark': watermark}
+
+    def _raw_ranges(self, pipeline):
+        """(start, end) of every raw-reading range a summary pipeline reads"""
+        pipelines = [pipeline] + [stage['$unionWith']['pipeline'] for stage in pipeline if '$unionWith' in stage]
+        ranges = []
+        for stages in pipelines:
+            timestamp = stages[0]['$match'].get('timestamp')
+            if timestamp is not None:
+                ranges.append((timestamp['$gte'], timestamp.get('$lt')))
+        return sorted(ranges, key=lambda r: r[0])
+
+    def test_first_refresh_backfills_the_retention_window(self):
+        self.db.rollup_state.find_one.return_value = None
+        self.db.refresh_sensor_rollups()
+        match = self.db.sensor_readings.aggregate.call_args[0][0][0]['$match']['timestamp']
+        watermark = datetime(2024, 1, 2, 12, 30)
+        self.assertEqual(match, {'$gte': watermark - timedelta(days=30), '$lt': watermark})
+        self.db.rollup_state.replace_one.assert_called_once_with(
+            {'_id': 'sensor_rollups_1m'},
+            {'covered_from': watermark - timedelta(days=30), 'watermark': watermark},
+            upsert=True
+        )
+
+    def test_later_refresh_resumes_from_the_stored_watermark(self):
+        covered_from = datetime(2023, 12, 3, 9, 0)
+        self._set_coverage(covered_from, datetime(2024, 1, 2, 12, 25))
+        self.db.refresh_sensor_rollups()
+        match = self.db.sensor_readings.aggregate.call_args[0][0][0]['$match']['timestamp']
+        self.assertEqual(match, {'$gte': datetime(2024, 1, 2, 12, 24), '$lt': datetime(2024, 1, 2, 12, 30)})
+        stored = self.db.rollup_state.replace_one.call_args[0][1]
+        self.assertEqual(stored['covered_from'], covered_from)
+
+    def test_summary_reads_raw_readings_before_any_refresh(self):
+        self.db.rollup_state.find_one.return_value = None
+        self.db.get_sensor_aggregate_summary(hours=48)
+        self.db.sensor_rollups.aggregate.assert_not_called()
+        pipeline = self.db.sensor_readings.aggregate.call_args[0][0]
+        self.assertEqual(self._raw_ranges(pipeline), [(self.NOW - timedelta(hours=48), None)])
+
+    def test_summary_fills_the_edges_around_covered_minutes(self):
+        covered_from = datetime(2024, 1, 2, 0, 0)
+        watermark = datetime(2024, 1, 2, 12, 28)
+        self._set_coverage(covered_from, watermark)
+        # Reaches back past the coverage, e.g. right after the first backfill expired
+        cutoff = self.NOW - timedelta(hours=36)
+        self.db.get_sensor_aggregate_summary(hours=36)
+
+        self.db.sensor_readings.aggregate.assert_not_called()
+        pipeline = self.db.sensor_rollups.aggregate.call_args[0][0]
+        self.assertEqual(pipeline[0], {'$match': {'minute': {'$gte': covered_from, '$lt': watermark}}})
+        self.assertEqual(self._raw_ranges(pipeline), [(cutoff, covered_from), (watermark, None)])
+
+    def test_summary_reads_the_partial_cutoff_minute_raw(self):
+        self._set_coverage(datetime(2023, 12, 3, 12, 0), datetime(2024, 1, 2, 12, 30))
+        cutoff = self.NOW - timedelta(hours=1)
+        self.db.get_sensor_aggregate_summary(hours=1)
+
+        pipeline = self.db.sensor_rollups.aggregate.call_args[0][0]
+        first_whole_minute = datetime(2024, 1, 2, 11, 31)
+        self.assertEqual(pipeline[0]['$match']['minute']['$gte'], first_whole_minute)
+        self.assertEqual(
+            self._raw_ranges(pipeline),
+            [(cutoff, first_whole_minute), (datetime(2024, 1, 2, 12, 30), None)]
+        )
+
+
+
+class CollectionCountTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = _manager(cache_ttl=0)
+        self.addCleanup(self.db.close)
+        self.db.timeseries_collections = {'sensor_readings'}
+        self.series = mock.Mock(**{'count_documents.return_value': 7})
+        self.series.name = 'sensor_readings'
+        self.regular = mock.Mock(**{'estimated_document_count.return_value': 3})
+        self.regular.name = 'decision_logs'
+
+    def test_time_series_total_is_a_real_count(self):
+        self.assertEqual(self.db._count_all(self.series), 7)
+        self.series.count_documents.assert_called_once_with({})
+        self.series.estimated_document_count.assert_not_called()
+
+    def test_regular_total_comes_from_metadata(self):
+        self.assertEqual(self.db._count_all(self.regular), 3)
+        self.regular.count_documents.assert_not_called()
+
+    def test_cleanup_tolerates_time_series_deletes_on_older_servers(self):
+        self.series.delete_many.side_effect = OperationFailure('cannot delete from a time-series collection')
+        self.db.sensor_readings = self.series
+        self.db.actuator_commands = self.db.gateway_logs = mock.Mock(name='other')
+        self.db.decision_logs = self.regular
+        with self.assertLogs('backend.controller.database', 'WARNING'):
+            self.db.cleanup_old_data(days=7)
+        self.regular.delete_many.assert_called_once()
+
+    def test_cleanup_failure_on_a_regular_collection_is_raised(self):
+        self.regular.delete_many.side_effect = OperationFailure('not authorized')
+        self.db.sensor_readings = self.series
+        self.db.actuator_commands = self.db.gateway_logs = mock.Mock(name='other')
+        self.db.decision_logs = self.regular
+        with self.assertRaises(OperationFailure):
+            self.db.cleanup_old_data(days=7)
+
+
+if __name__ == '__main__':
+    unittest.main()
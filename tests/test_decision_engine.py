@@ -0,0 +1,190 @@
+"""
+Tests for the decision engine's dispatch and command coalescing
+"""
+import random
+import unittest
+from unittest import mock
+
+from backend.controller import decision_engine
+from backend.controller.decision_engine import REASON_FIRE_SAFETY, DecisionEngine
+from backend.models import ActuatorCommand
+
+
+def _command(actuator_id, actuator_type, state, value=None, reason=''):
+    return ActuatorCommand(
+        actuator_id=actuator_id,
+        actuator_type=actuator_type,
+        state=state,
+        value=value,
+        reason=reason
+    )
+
+
+class CoalesceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = DecisionEngine()
+
+    def test_last_command_per_actuator_wins(self):
+        kept = self.engine._coalesce([
+            _command('hvac_system', 'climate_control', 'fan_only'),
+            _command('hvac_system', 'climate_control', 'cooling')
+        ])
+        self.assertEqual([(c.actuator_id, c.state) for c in kept], [('hvac_system', 'cooling')])
+
+    def test_state_only_noop_is_dropped(self):
+        self.engine.update_actuator_state('dehumidifier', 'on')
+        kept = self.engine._coalesce([_command('dehumidifier', 'appliance', 'on')])
+        self.assertEqual(kept, [])
+
+    def test_noop_check_uses_the_surviving_command(self):
+        self.engine.update_actuator_state('dehumidifier', 'on')
+        kept = self.engine._coalesce([
+            _command('dehumidifier', 'appliance', 'off'),
+            _command('dehumidifier', 'appliance', 'on')
+        ])
+        self.assertEqual(kept, [])
+
+    def test_command_with_value_is_kept_in_same_state(self):
+        self.engine.update_actuator_state('living_room_lights', 'on')
+        kept = self.engine._coalesce([_command('living_room_lights', 'light', 'on', value=80)])
+        self.assertEqual(len(kept), 1)
+
+    def test_commands_are_ordered_by_salience(self):
+        kept = self.engine._coalesce([
+            _command('living_room_lights', 'light', 'on', value=80),
+            _command('hvac_system', 'climate_control', 'cooling'),
+            _command('bedroom_lights', 'light', 'on', value=80),
+            _command('gas_alarm', 'alarm', 'on'),
+            _command('water_shutoff', 'valve', 'closed')
+        ])
+        self.assertEqual(
+            [c.actuator_id for c in kept],
+            # Stable within a salience level: the two lights keep their emission order
+            ['gas_alarm', 'water_shutoff', 'hvac_system', 'living_room_lights', 'bedroom_lights']
+        )
+
+    def test_payload_commands_are_coalesced(self):
+        commands = self.engine.process_sensor_data({
+            'device_id': 'basement',
+            'location': 'basement',
+            'readings': [
+                {'sensor_type': 'humidity', 'value': 95.0},
+                {'sensor_type': 'humidity', 'value': 96.0}
+            ]
+        })
+        self.assertEqual([(c.actuator_id, c.state) for c in commands], [('dehumidifier', 'on')])
+        self.assertIn('96.0', str(commands[0].reason))
+
+
+class LightDispatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = DecisionEngine()
+
+    def test_dark_reading_turns_on_the_colocated_light(self):
+        commands = self.engine.process_sensor_data({
+            'device_id': 'bedroom',
+            'location': 'bedroom',
+            'readings': [{'sensor_type': 'light', 'value': 50.0}]
+        })
+        self.assertEqual([(c.actuator_id, c.state) for c in commands], [('bedroom_lights', 'on')])
+
+    def test_location_without_a_light_gets_no_light_command(self):
+        commands = self.engine.process_sensor_data({
+            'device_id': 'garden',
+            'location': 'garden',
+            'readings': [{'sensor_type': 'light', 'value': 50.0}]
+        })
+        self.assertEqual(commands, [])
+
+
+class SafetyOverrideTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = DecisionEngine()
+
+    def test_safety_command_beats_a_later_command(self):
+        kept = self.engine._coalesce([
+            _command('hvac_system', 'climate_control', 'off', reason=REASON_FIRE_SAFETY),
+            _command('hvac_system', 'climate_control', 'cooling', reason='High average temperature')
+        ])
+        self.assertEqual([(c.state, c.reason) for c in kept], [('off', REASON_FIRE_SAFETY)])
+
+    def test_safety_command_beats_an_earlier_command(self):
+        kept = self.engine._coalesce([
+            _command('hvac_system', 'climate_control', 'fan_only', reason='Elevated CO2 level'),
+            _command('hvac_system', 'climate_control', 'off', reason=REASON_FIRE_SAFETY)
+        ])
+        self.assertEqual([(c.state, c.reason) for c in kept], [('off', REASON_FIRE_SAFETY)])
+
+    def test_smoke_keeps_hvac_off_despite_critical_temperature(self):
+        self.engine.update_actuator_state('hvac_system', 'cooling')
+        # The critical temperature's HVAC decision is emitted after the smoke handler ran
+        commands = self.engine.process_sensor_data({
+            'device_id': 'kitchen',
+            'location': 'kitchen',
+            'readings': [
+                {'sensor_type': 'smoke', 'value': 1},
+                {'sensor_type': 'temperature', 'value': 45.0}
+            ]
+        })
+        by_actuator = {c.actuator_id: c for c in commands}
+        self.assertEqual(len(by_actuator), len(commands))
+        self.assertEqual(by_actuator['hvac_system'].state, 'off')
+        self.assertEqual(by_actuator['hvac_system'].reason, REASON_FIRE_SAFETY)
+        self.assertEqual(by_actuator['fire_alarm'].state, 'on')
+        # Alarms are committed before climate control
+        self.assertLess(commands.index(by_actuator['fire_alarm']), commands.index(by_actuator['hvac_system']))
+
+
+
+class AggregatedTemperatureTest(unittest.TestCase):
+    """The NumPy reduction used for large fleets must decide exactly like the scalar loop"""
+
+    LOCATIONS = ('living_room', 'bedroom', 'kitchen', 'roof', 'basement', 'garage')
+
+    def _decide(self, all_temps, hvac_state, vectorize):
+        engine = DecisionEngine()
+        engine.update_actuator_state('hvac_system', hvac_state)
+        threshold = decision_engine.VECTORIZE_MIN_TEMPERATURES if vectorize else len(all_temps) + 1
+        commands = []
+        with mock.patch.object(decision_engine, 'VECTORIZE_MIN_TEMPERATURES', threshold), \
+                self.assertLogs('backend.controller.decision_engine', 'INFO') as logs:
+            engine._process_aggregated_temperature(all_temps, commands.append)
+        summary = [line for line in logs.output if 'Temperature aggregation' in line]
+        return summary, [(c.actuator_id, c.state, str(c.reason)) for c in commands]
+
+    def _fleet(self, rng, count, low, high):
+        return [
+            {'location': rng.choice(self.LOCATIONS), 'value': round(rng.uniform(low, high), 2)}
+            for _ in range(count)
+        ]
+
+    def test_vector_path_matches_scalar_path(self):
+        rng = random.Random(7)
+        cases = [
+            (self._fleet(rng, 24, 15.0, 25.0), 'off'),      # one room below the low threshold
+            (self._fleet(rng, 24, 29.0, 36.0), 'off'),      # hot on average
+            (self._fleet(rng, 32, 20.0, 41.0), 'off'),      # one room critical
+            (self._fleet(rng, 16, 20.0, 27.0), 'cooling'),  # cooled down
+            (self._fleet(rng, 40, 8.0, 17.0), 'off'),       # cold everywhere
+        ]
+        for all_temps, hvac_state in cases:
+            self.assertGreaterEqual(len(all_temps), decision_engine.VECTORIZE_MIN_TEMPERATURES)
+            with self.subTest(count=len(all_temps), hvac_state=hvac_state):
+                self.assertEqual(
+                    self._decide(all_temps, hvac_state, vectorize=True),
+                    self._decide(all_temps, hvac_state, vectorize=False)
+                )
+
+    def test_unweighted_locations_count_once(self):
+        all_temps = [{'location': 'garage', 'value': 31.0}] * 20
+        _, commands = self._decide(all_temps, 'off', vectorize=True)
+        self.assertEqual(commands, [
+            ('hvac_system', 'cooling', 'High average temperature: 31.0°C across 20 locations')
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Tests for the sensor gateway's filtering statistics
+"""
+import unittest
+from unittest import mock
+
+from sensors.gateway import SensorGateway
+
+
+def _payload(index):
+    # Between one and three readings; every third payload carries an out-of-range temperature
+    readings = [{'sensor_type': 'humidity', 'value': 40.0 + i, 'unit': '%'} for i in range(index % 3)]
+    readings.append({'sensor_type': 'temperature', 'value': 99.0 if index % 3 == 0 else 21.0, 'unit': 'C'})
+    return {
+        'device_id': 'kitchen',
+        'location': 'kitchen',
+        'timestamp': f'2024-01-01T12:00:{index:02d}',
+        'readings': readings
+    }
+
+
+class GatewayStatisticsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.gateway = SensorGateway('http://controller.invalid')
+        self.gateway.max_statistics_logs = 5
+        patcher = mock.patch('sensors.gateway.requests.post', return_value=mock.Mock(status_code=200))
+        self.post = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_totals_match_log(self):
+        log = self.gateway.statistics_log
+        self.assertEqual(self.gateway.window_processed, sum(entry['original_count'] for entry in log))
+        self.assertEqual(self.gateway.window_outliers, sum(entry['outliers_detected'] for entry in log))
+
+    def test_empty_gateway_reports_zero(self):
+        self.assertEqual(self.gateway.get_statistics(), {'total_processed': 0, 'total_outliers': 0, 'filter_rate': 0})
+
+    def test_running_totals_match_log_after_eviction(self):
+        for index in range(13):
+            self.gateway.process_sensor_data(_payload(index))
+            self.assert_totals_match_log()
+        self.assertEqual(len(self.gateway.statistics_log), 5)
+        self.assertEqual(self.post.call_count, 13)
+
+        stats = self.gateway.get_statistics()
+        self.assertEqual(stats['total_processed'], self.gateway.window_processed)
+        self.assertEqual(stats['total_outliers'], self.gateway.window_outliers)
+        self.assertGreater(stats['total_outliers'], 0)
+        self.assertEqual(stats['filter_rate'], stats['total_outliers'] / stats['total_processed'])
+        self.assertEqual(stats['recent_logs'], list(self.gateway.statistics_log))
+
+
+if __name__ == '__main__':
+    unittest.main()
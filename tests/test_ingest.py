@@ -0,0 +1,129 @@
+"""
+Tests for sensor payload ingestion helpers
+"""
+import unittest
+
+from backend.controller.ingest import (
+    RecentResults,
+    _parse_sensor_xml_fast,
+    _parse_sensor_xml_lxml,
+    parse_sensor_xml,
+    payload_fingerprint
+)
+
+# As sent by the sensor service: pretty-printed, empty <unit/> and an object_name extra
+FLAT_XML = b'''<?xml version="1.0" encoding="utf-8"?>
+<sensor_data>
+  <device_id>dust_cleaner</device_id>
+  <location>mobile</location>
+  <timestamp>2024-01-01T12:00:00</timestamp>
+  <sensors>
+    <sensor>
+      <type>distance</type>
+      <value>42.5</value>
+      <unit>cm</unit>
+      <object_name>chair</object_name>
+    </sensor>
+    <sensor>
+      <type>object_detection</type>
+      <value>chair</value>
+      <unit/>
+    </sensor>
+  </sensors>
+</sensor_data>'''
+
+COMPACT_XML = (
+    b'<sensor_data><device_id>kitchen</device_id><location>kitchen</location><sensors>'
+    b'<sensor><type>gas</type><value>310</value><unit>ppm</unit></sensor>'
+    b'<sensor><type>smoke</type><value>0</value><unit>boolean</unit></sensor>'
+    b'</sensors></sensor_data>'
+)
+
+# Flat sensor data wrapped in a SOAP envelope
+SOAP_XML = b'''<?xml version="1.0"?>
+<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
+  <soap:Body>
+    <sensor_data>
+      <device_id>roof_station</device_id>
+      <location>roof</location>
+      <sensors>
+        <sensor><type>temperature</type><value>21.5</value><unit>C</unit></sensor>
+      </sensors>
+    </sensor_data>
+  </soap:Body>
+</soap:Envelope>'''
+
+
+class RecentResultsTest(unittest.TestCase):
+
+    def test_payload_without_timestamp_has_no_fingerprint(self):
+        data = {
+            'device_id': 'living_room',
+            'location': 'living_room',
+            'readings': [{'sensor_type': 'motion', 'value': 1, 'unit': 'boolean'}]
+        }
+        self.assertIsNone(payload_fingerprint(data))
+        self.assertIsNotNone(payload_fingerprint(dict(data, timestamp='2024-01-01T12:00:00.000001')))
+
+    def test_size_bound_evicts_oldest(self):
+        recent = RecentResults(5.0, max_size=2)
+        for key in (b'a', b'b', b'c'):
+            recent.put(key, {'key': key})
+        self.assertIsNone(recent.get(b'a'))
+        self.assertEqual(recent.get(b'c'), {'key': b'c'})
+
+
+class ParseSensorXmlTest(unittest.TestCase):
+
+    def assert_matches_lxml(self, xml_data, fast_path):
+        parsed = parse_sensor_xml(xml_data)
+        self.assertEqual(parsed, _parse_sensor_xml_lxml(xml_data))
+        if fast_path:
+            self.assertIsNotNone(_parse_sensor_xml_fast(xml_data))
+        else:
+            self.assertIsNone(_parse_sensor_xml_fast(xml_data))
+        return parsed
+
+    def test_flat_payload_uses_fast_path(self):
+        device_id, location, readings = self.assert_matches_lxml(FLAT_XML, fast_path=True)
+        self.assertEqual((device_id, location), ('dust_cleaner', 'mobile'))
+        self.assertEqual(readings, [
+            {'sensor_type': 'distance', 'value': 42.5, 'unit': 'cm'},
+            {'sensor_type': 'object_detection', 'value': 'chair', 'unit': ''}
+        ])
+
+    def test_compact_payload_uses_fast_path(self):
+        self.assert_matches_lxml(COMPACT_XML, fast_path=True)
+
+    def test_payload_inside_soap_envelope(self):
+        self.assert_matches_lxml(SOAP_XML, fast_path=True)
+
+    def test_nested_markup_in_sensor_falls_back(self):
+        xml_data = COMPACT_XML.replace(b'<unit>ppm</unit>', b'<unit>ppm</unit><meta><calibrated>1</calibrated></meta>')
+        self.assert_matches_lxml(xml_data, fast_path=False)
+
+    def test_nested_device_id_falls_back(self):
+        xml_data = COMPACT_XML.replace(
+            b'<device_id>kitchen</device_id>',
+            b'<device_id><serial>k-1</serial></device_id><device_id>kitchen</device_id>'
+        )
+        device_id, _, _ = self.assert_matches_lxml(xml_data, fast_path=False)
+        self.assertEqual(device_id, 'k-1')
+
+    def test_attributes_on_sensor_fall_back(self):
+        xml_data = COMPACT_XML.replace(b'<sensor>', b'<sensor id="1">', 1)
+        self.assert_matches_lxml(xml_data, fast_path=False)
+
+    def test_entities_fall_back(self):
+        xml_data = COMPACT_XML.replace(b'<location>kitchen</location>', b'<location>kitchen &amp; dining</location>')
+        _, location, _ = self.assert_matches_lxml(xml_data, fast_path=False)
+        self.assertEqual(location, 'kitchen & dining')
+
+    def test_other_declared_encoding_falls_back(self):
+        xml_data = b'<?xml version="1.0" encoding="iso-8859-1"?>' + COMPACT_XML.replace(b'kitchen</location>', b'cuisine \xe9t\xe9</location>')
+        _, location, _ = self.assert_matches_lxml(xml_data, fast_path=False)
+        self.assertEqual(location, 'cuisine \u00e9t\u00e9')
+
+
+if __name__ == '__main__':
+    unittest.main()
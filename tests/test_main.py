@@ -0,0 +1,216 @@
+"""
+Tests for the controller's HTTP layer (no MongoDB: the database manager is mocked)
+"""
+import os
+import threading
+import unittest
+from types import MappingProxyType
+from unittest import mock
+
+from backend.controller.ingest import RecentResults
+from backend.models import ActuatorCommand
+
+with mock.patch('backend.controller.database.DatabaseManager'):
+    from backend.controller import main
+
+
+class CorsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = main.app.test_client()
+
+    def _preflight(self, origin):
+        return self.client.options('/api/actuators', headers={
+            'Origin': origin,
+            'Access-Control-Request-Method': 'GET'
+        })
+
+    def test_configured_origin_is_allowed(self):
+        origin = sorted(main.Config.CORS_ORIGINS)[0]
+        response = self._preflight(origin)
+        self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), origin)
+
+    def test_other_origin_is_not_allowed(self):
+        response = self._preflight('http://evil.test')
+        self.assertNotIn('Access-Control-Allow-Origin', response.headers)
+
+
+
+class SocketIOJSONTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = main.socketio.test_client(main.app)
+        self.addCleanup(self.client.disconnect)
+        self.client.get_received()
+
+    def _received(self, name):
+        return [event['args'][0] for event in self.client.get_received() if event['name'] == name]
+
+    def test_frames_are_encoded_with_orjson(self):
+        with mock.patch.object(main.orjson, 'dumps', wraps=main.orjson.dumps) as dumps:
+            self.client.emit('request_status')
+            self.assertTrue(dumps.called)
+        (status,) = self._received('status_update')
+        self.assertEqual(len(status['actuators']), len(main.actuator_states))
+
+    def test_config_containers_serialize_like_the_rest_api(self):
+        main.socketio.emit('config_update', {
+            'origins': frozenset({'http://b.test', 'http://a.test'}),
+            'ranges': MappingProxyType({'temperature': {'min': 15.0}})
+        })
+        (frame,) = self._received('config_update')
+        self.assertEqual(frame, {
+            'origins': ['http://a.test', 'http://b.test'],
+            'ranges': {'temperature': {'min': 15.0}}
+        })
+
+
+
+class ActuatorStateTest(unittest.TestCase):
+
+    STATES = ('on', 'off', 'on', 'off', 'on')
+
+    def setUp(self):
+        for patcher in (mock.patch.object(main, 'db'), mock.patch.object(main.socketio, 'emit')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self._switch_all_off)
+
+    def _switch_all_off(self):
+        for actuator_id, status in main.actuator_states.items():
+            main.execute_actuator_command(ActuatorCommand(
+                actuator_id=actuator_id, actuator_type=status.actuator_type, state='off', reason='test cleanup'
+            ))
+
+    def _toggle_concurrently(self, actuator_ids, rounds=200):
+        def toggle(offset):
+            for i in range(rounds):
+                actuator_id = actuator_ids[(offset + i) % len(actuator_ids)]
+                main.execute_actuator_command(ActuatorCommand(
+                    actuator_id=actuator_id,
+                    actuator_type=main.actuator_states[actuator_id].actuator_type,
+                    state=self.STATES[(offset + i) % len(self.STATES)],
+                    reason='concurrency test'
+                ))
+        threads = [threading.Thread(target=toggle, args=(offset,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_decision_engine_cache_follows_concurrent_commands(self):
+        actuator_ids = sorted(main.actuator_states)[:3]
+        self._toggle_concurrently(actuator_ids)
+        for actuator_id in actuator_ids:
+            self.assertEqual(
+                main.decision_engine.actuator_states[actuator_id],
+                main.actuator_states[actuator_id].state
+            )
+
+    def test_active_count_matches_the_states_after_concurrent_commands(self):
+        self._toggle_concurrently(sorted(main.actuator_states)[:4])
+        summary = main._build_actuator_summary()
+        recomputed = sum(1 for state in summary['states'].values() if state != 'off')
+        self.assertEqual(summary['active'], recomputed)
+        self.assertEqual(main.active_actuator_count, recomputed)
+
+
+
+def _payload(timestamp='2024-01-01T12:00:00.000001', motion=1):
+    return {
+        'device_id': 'living_room',
+        'location': 'living_room',
+        'readings': [
+            {'sensor_type': 'motion', 'value': motion, 'unit': 'boolean'},
+            {'sensor_type': 'light', 'value': 120.0, 'unit': 'lux'}
+        ],
+        'timestamp': timestamp
+    }
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class RetransmitTest(unittest.TestCase):
+    """process_sensor_data and the gateway endpoint answer retransmits without new writes"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patchers = [
+            mock.patch.object(main, 'db'),
+            mock.patch.object(main, 'decision_engine', **{'process_sensor_data.return_value': []}),
+            mock.patch.object(main, 'ml_manager', **{'predict_commands.return_value': []}),
+            mock.patch.object(main, 'recent_results', RecentResults(5.0, clock=self.clock)),
+            mock.patch.object(main.socketio, 'emit')
+        ]
+        self.db, self.engine = (patcher.start() for patcher in patchers[:2])
+        for patcher in patchers[2:]:
+            patcher.start()
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    @property
+    def processed(self):
+        return self.db.store_sensor_readings_batch.call_count
+
+    def test_retransmit_is_answered_from_cache(self):
+        first = main.process_sensor_data(_payload())
+        self.clock.now += 1.0
+        again = main.process_sensor_data(_payload())
+        self.assertIs(again, first)
+        self.assertEqual(self.processed, 1)
+        self.assertEqual(self.engine.process_sensor_data.call_count, 1)
+
+    def test_new_reading_with_same_values_is_processed(self):
+        main.process_sensor_data(_payload(timestamp='2024-01-01T12:00:00.000001'))
+        self.clock.now += 0.5
+        main.process_sensor_data(_payload(timestamp='2024-01-01T12:00:00.500001'))
+        self.assertEqual(self.processed, 2)
+
+    def test_changed_values_are_processed(self):
+        main.process_sensor_data(_payload(motion=1))
+        main.process_sensor_data(_payload(motion=0))
+        self.assertEqual(self.processed, 2)
+
+    def test_payload_without_timestamp_is_never_deduplicated(self):
+        data = _payload()
+        del data['timestamp']
+        main.process_sensor_data(data)
+        main.process_sensor_data(dict(data))
+        self.assertEqual(self.processed, 2)
+
+    def test_manual_override_is_never_deduplicated(self):
+        main.process_sensor_data(dict(_payload(), manual_override=True))
+        main.process_sensor_data(dict(_payload(), manual_override=True))
+        self.assertEqual(self.processed, 2)
+
+    def test_retransmit_after_window_is_processed(self):
+        main.process_sensor_data(_payload())
+        self.clock.now += 5.0
+        main.process_sensor_data(_payload())
+        self.assertEqual(self.processed, 2)
+
+    def test_gateway_retransmit_writes_no_second_log(self):
+        client = main.app.test_client()
+        data = dict(_payload(), gateway_stats={'outliers_removed': 1, 'outlier_details': []})
+        headers = {'X-Gateway-Key': main.security_manager.gateway_key}
+        with mock.patch.dict(os.environ, {'ASYNC_INGEST': 'false'}):
+            self.addCleanup(main.Config.reset_env_cache)
+            main.Config.reset_env_cache()
+            responses = [client.post('/api/sensor-data/gateway', json=data, headers=headers) for _ in range(2)]
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(responses[1].get_json(), responses[0].get_json())
+        self.assertEqual(self.db.store_gateway_logs_batch.call_count, 1)
+        self.assertEqual(self.processed, 1)
+        self.assertEqual(main.socketio.emit.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()